@@ -0,0 +1,139 @@
+"""
+Flux de l'API : spectacles à venir, revue de presse, témoignages.
+
+Chaque flux est sérialisé en entier une seule fois par version, puis gardé
+dans le cache Django partagé par les workers. La version `api` (voir
+`home.cache`) change à chaque publication, déplacement ou suppression de page
+et à chaque modification d'un témoignage ; la date du jour en fait aussi
+partie (les spectacles passés disparaissent à minuit). Tant qu'elle ne change
+pas, une interrogation ne coûte ni requête SQL ni sérialisation.
+
+La pagination est "par curseur" : le curseur encode la clé de tri du dernier
+élément reçu, la page suivante commence juste après elle. Une publication
+entre deux pages ne fait ni sauter ni répéter d'élément.
+"""
+
+import base64
+import binascii
+import json
+from bisect import bisect_right
+from datetime import date
+
+from django.core.cache import cache
+
+from home.cache import PAGE_CACHE_PREFIX, get_version
+from home.metrics import record_cache
+from home.models import PressPage, Show, Testimonial
+
+from .serializers import PressArticleSerializer, ShowSerializer, TestimonialSerializer
+
+API_VERSION = "api"
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_feed_version():
+    return f"{get_version(API_VERSION)}:{date.today().isoformat()}"
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Clé de tri encodée dans un curseur. Lève ValueError s'il est invalide."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(cursor) from e
+    if not isinstance(key, list):
+        raise ValueError(cursor)
+    return tuple(key)
+
+
+class Feed:
+    name = None
+    serializer_class = None
+
+    def get_objects(self):
+        raise NotImplementedError
+
+    def sort_key(self, obj):
+        """Clé de tri croissante et unique, composée de types JSON."""
+        raise NotImplementedError
+
+    @property
+    def fields(self):
+        return list(self.serializer_class().fields)
+
+    def build(self):
+        objects = sorted(self.get_objects(), key=self.sort_key)
+        return {
+            "keys": [self.sort_key(obj) for obj in objects],
+            # Simples dictionnaires : la ReturnList de DRF garde une référence au sérialiseur.
+            "items": [dict(item) for item in self.serializer_class(objects, many=True).data],
+        }
+
+    def get_data(self, version):
+        """Flux sérialisé complet, depuis le cache si possible."""
+        key = f"{PAGE_CACHE_PREFIX}:api:{self.name}:{version}"
+        data = cache.get(key)
+        record_cache("api", hit=data is not None)
+        if data is None:
+            data = self.build()
+            cache.set(key, data, FEED_CACHE_TIMEOUT)
+        return data
+
+    def page(self, version, after=None, limit=20):
+        """
+        (éléments, clé du dernier élément s'il en reste d'autres). Lève
+        ValueError si `after` ne correspond pas aux clés de ce flux.
+        """
+        data = self.get_data(version)
+        keys, items = data["keys"], data["items"]
+        try:
+            start = bisect_right(keys, after) if after is not None else 0
+        except TypeError as e:
+            # Curseur d'une autre forme (autre flux, modifié à la main).
+            raise ValueError(after) from e
+        end = start + limit
+        return items[start:end], keys[end - 1] if end < len(keys) else None
+
+
+class ShowFeed(Feed):
+    name = "shows"
+    serializer_class = ShowSerializer
+
+    def get_objects(self):
+        return Show.objects.live().upcoming().select_related("page", "poster")
+
+    def sort_key(self, show):
+        # Identifiant du bloc StreamField : la ligne `Show` est recréée à chaque publication.
+        return (show.date.isoformat(), show.time.isoformat() if show.time else "", show.block_id)
+
+
+class PressFeed(Feed):
+    name = "press"
+    serializer_class = PressArticleSerializer
+
+    def get_objects(self):
+        articles = []
+        for page in PressPage.objects.live().public():
+            for position, block in enumerate(page.press_articles):
+                articles.append({**block.value, "id": block.id, "page": page, "position": position})
+        return articles
+
+    def sort_key(self, article):
+        # Les plus récents d'abord, les articles sans date à la fin.
+        published = article["publication_date"]
+        return (-published.toordinal() if published else 0, article["page"].pk, article["position"])
+
+
+class TestimonialFeed(Feed):
+    name = "testimonials"
+    serializer_class = TestimonialSerializer
+
+    def get_objects(self):
+        return Testimonial.objects.all()
+
+    def sort_key(self, testimonial):
+        return (testimonial.pk,)
@@ -0,0 +1,53 @@
+from rest_framework import serializers
+
+from home.models import Show, Testimonial
+from home.renditions import register_filter_spec
+
+# Mêmes renditions que les gabarits, donc déjà générées par `generate_renditions` :
+# l'<img> JPEG 1x de `{% responsive_picture show.poster fill-300x400 %}`
+# (shows_page.html) et le `{% image ... height-100 %}` de press_page.html.
+POSTER_FILTER = register_filter_spec("fill-300x400|format-jpeg")
+LOGO_FILTER = register_filter_spec("height-100")
+
+
+def rendition_url(image, filter_spec):
+    return image.get_rendition(filter_spec).url if image else None
+
+
+class ShowSerializer(serializers.ModelSerializer):
+    # Stable d'une publication à l'autre, contrairement à la clé de `Show`.
+    id = serializers.CharField(source="block_id", read_only=True)
+    poster = serializers.SerializerMethodField()
+    page_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Show
+        fields = ["id", "title", "date", "time", "venue", "city", "description", "ticket_link", "poster", "page_url"]
+
+    def get_poster(self, show):
+        return rendition_url(show.poster, POSTER_FILTER)
+
+    def get_page_url(self, show):
+        return show.page.full_url
+
+
+class PressArticleSerializer(serializers.Serializer):
+    """Un bloc `PressArticleBlock` d'une `PressPage` (dictionnaire préparé par le flux)."""
+
+    id = serializers.CharField()
+    publication_name = serializers.CharField()
+    article_type = serializers.CharField()
+    article_url = serializers.URLField(allow_blank=True, allow_null=True)
+    publication_date = serializers.DateField(allow_null=True)
+    excerpt = serializers.CharField(allow_blank=True, allow_null=True)
+    logo = serializers.SerializerMethodField()
+    page_url = serializers.CharField(source="page.full_url")
+
+    def get_logo(self, article):
+        return rendition_url(article["publication_logo"], LOGO_FILTER)
+
+
+class TestimonialSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Testimonial
+        fields = ["id", "quote", "author"]
@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from wagtail.models import Page
+from wagtail.signals import page_published, page_unpublished, post_page_move
+
+from home.cache import bump_version
+from home.models import Testimonial
+
+from .feeds import API_VERSION
+
+
+# ==========================================
+# 🔌 INVALIDATION DES FLUX DE L'API
+# ==========================================
+
+@receiver(page_published)
+@receiver(page_unpublished)
+@receiver(post_page_move)
+@receiver(post_delete, sender=Page)
+@receiver(post_save, sender=Testimonial)
+@receiver(post_delete, sender=Testimonial)
+def refresh_api_feeds(sender, **kwargs):
+    bump_version(API_VERSION)
@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import views
+
+app_name = "api"
+
+urlpatterns = [
+    path("shows/", views.ShowFeedView.as_view(), name="shows"),
+    path("press/", views.PressFeedView.as_view(), name="press"),
+    path("testimonials/", views.TestimonialFeedView.as_view(), name="testimonials"),
+]
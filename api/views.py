@@ -0,0 +1,84 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .feeds import PressFeed, ShowFeed, TestimonialFeed, decode_cursor, encode_cursor, get_feed_version
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+class FeedView(APIView):
+    """
+    Lecture seule, sans authentification ni cookie : la réponse ne dépend que
+    des paramètres (`fields`, `limit`, `cursor`) et de la version du flux.
+    """
+
+    feed_class = None
+    http_method_names = ["get", "head", "options"]
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    renderer_classes = [JSONRenderer]
+
+    def get_params(self, request):
+        feed = self.feed_class()
+        fields = [name for name in request.query_params.get("fields", "").split(",") if name]
+        unknown = sorted(set(fields) - set(feed.fields))
+        if unknown:
+            raise ValidationError({"fields": [f"Champs inconnus : {', '.join(unknown)}. Disponibles : {', '.join(feed.fields)}."]})
+        try:
+            limit = min(max(int(request.query_params.get("limit", DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        except ValueError:
+            raise ValidationError({"limit": ["Nombre entier attendu."]})
+        cursor = request.query_params.get("cursor") or None
+        return feed, fields, limit, cursor
+
+    def get(self, request):
+        feed, fields, limit, cursor = self.get_params(request)
+        version = get_feed_version()
+        etag = '"{}"'.format(hashlib.md5(f"{feed.name}|{version}|{fields}|{limit}|{cursor}".encode()).hexdigest())
+
+        # Le client a déjà cette version : ni lecture du cache, ni sérialisation.
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            try:
+                items, last_key = feed.page(version, decode_cursor(cursor) if cursor else None, limit)
+            except ValueError:
+                raise ValidationError({"cursor": ["Curseur invalide."]})
+            if fields:
+                items = [{name: item[name] for name in fields} for item in items]
+            next_url = None
+            if last_key is not None:
+                next_url = request.build_absolute_uri(
+                    "?" + self.next_query_string(request, encode_cursor(last_key))
+                )
+            response = Response({"next": next_url, "results": items})
+
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, max_age=60)
+        patch_vary_headers(response, ["Accept"])
+        # Données publiques, lues par des widgets sur d'autres sites.
+        response["Access-Control-Allow-Origin"] = "*"
+        return response
+
+    def next_query_string(self, request, cursor):
+        params = request.query_params.copy()
+        params["cursor"] = cursor
+        return params.urlencode()
+
+
+class ShowFeedView(FeedView):
+    feed_class = ShowFeed
+
+
+class PressFeedView(FeedView):
+    feed_class = PressFeed
+
+
+class TestimonialFeedView(FeedView):
+    feed_class = TestimonialFeed
@@ -0,0 +1,214 @@
+"""
+Bibliothèques front-end hébergées sur le site.
+
+`manage.py vendor_assets` télécharge les CSS/JS chargés jusqu'ici depuis des
+CDN (Font Awesome, slick, jQuery, Google Fonts) ainsi que les polices et images
+qu'ils référencent, puis les regroupe dans `static/vendor/bundle.css` et
+`bundle.js`. Le stockage `Manifest...` de la production ajoute l'empreinte aux
+noms de fichiers (et aux `url()` des polices), ce qui permet un cache
+d'un an.
+
+Tant que les fichiers n'ont pas été générés, les balises `{% vendor_styles %}`
+et `{% vendor_scripts %}` retombent sur les CDN.
+"""
+
+import json
+import posixpath
+import re
+from dataclasses import dataclass, field
+from functools import cache
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+VENDOR_DIR = "vendor"
+MANIFEST_NAME = f"{VENDOR_DIR}/assets.json"
+
+# Google Fonts ne sert du WOFF2 qu'aux navigateurs qu'il reconnaît.
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0 Safari/537.36"
+)
+
+
+@dataclass
+class VendorLibrary:
+    name: str
+    base_url: str
+    css: list = field(default_factory=list)
+    js: list = field(default_factory=list)
+    # Polices utilisées dès le premier affichage, annoncées par <link rel=preload>.
+    preload_fonts: list = field(default_factory=list)
+
+
+VENDOR_LIBRARIES = [
+    VendorLibrary(
+        "fontawesome",
+        "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.2/",
+        css=["css/all.min.css"],
+        preload_fonts=["webfonts/fa-solid-900.woff2", "webfonts/fa-brands-400.woff2"],
+    ),
+    VendorLibrary(
+        "jquery",
+        "https://code.jquery.com/",
+        js=["jquery-3.6.0.min.js"],
+    ),
+    VendorLibrary(
+        "slick",
+        "https://cdn.jsdelivr.net/npm/slick-carousel@1.8.1/slick/",
+        css=["slick.css", "slick-theme.css"],
+        js=["slick.min.js"],
+    ),
+    VendorLibrary(
+        "fonts",
+        "https://fonts.googleapis.com/",
+        css=["css2?family=Permanent+Marker&display=swap"],
+    ),
+]
+
+URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+STRING_RE = re.compile(r""""(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'""")
+COMMENT_RE = re.compile(r"/\*(?!!).*?\*/", re.S)
+
+
+def get_vendor_root():
+    return Path(settings.PROJECT_DIR) / "static" / VENDOR_DIR
+
+
+def fetch(url):
+    response = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=30)
+    response.raise_for_status()
+    return response.content
+
+
+# ==========================================
+# 🗜️ MINIFICATION
+# ==========================================
+
+def _minify_css_code(code):
+    code = re.sub(r"\s+", " ", code)
+    # Seulement après ":" : ".a :hover" et ".a:hover" ne ciblent pas les mêmes éléments.
+    code = re.sub(r"\s*([{};,>])\s*", r"\1", code).replace(": ", ":")
+    return code.replace(";}", "}")
+
+
+def minify_css(css):
+    """
+    Minification simple et sûre : commentaires (hors licences /*! */) et
+    espaces superflus, sans toucher au contenu des chaînes.
+    """
+    css = COMMENT_RE.sub("", css)
+    parts, position = [], 0
+    for match in STRING_RE.finditer(css):
+        parts.append(_minify_css_code(css[position:match.start()]))
+        parts.append(match.group())
+        position = match.end()
+    parts.append(_minify_css_code(css[position:]))
+    return "".join(parts).strip()
+
+
+# ==========================================
+# 📦 TÉLÉCHARGEMENT ET REGROUPEMENT
+# ==========================================
+
+def local_name(library, url):
+    """Chemin, relatif à `static/vendor/`, d'un fichier téléchargé."""
+    parts = urlsplit(url)
+    base_path = urlsplit(library.base_url).path
+    if url.startswith(library.base_url):
+        relative = parts.path[len(base_path):]
+    else:
+        relative = parts.path.lstrip("/")
+    return posixpath.join(library.name, posixpath.normpath(relative))
+
+
+def vendor_stylesheet(library, css_url, css, download):
+    """
+    Télécharge les fichiers référencés par une feuille de style et renvoie la
+    feuille avec des `url()` relatives au dossier `vendor/`.
+    """
+
+    def replace(match):
+        reference = match.group(2).strip()
+        if reference.startswith(("data:", "#")):
+            return match.group()
+        absolute = urljoin(css_url, reference)
+        fragment = ""
+        if "#" in absolute:
+            absolute, fragment = absolute.split("#", 1)
+            fragment = "#" + fragment
+        absolute = absolute.split("?", 1)[0]
+        name = local_name(library, absolute)
+        download(name, absolute)
+        return f'url("{name}{fragment}")'
+
+    return URL_RE.sub(replace, css)
+
+
+def build_vendor_assets(libraries=VENDOR_LIBRARIES, root=None):
+    """
+    Télécharge et regroupe les bibliothèques. Renvoie la liste des fichiers
+    écrits (relatifs à `static/vendor/`).
+    """
+    root = Path(root or get_vendor_root())
+    written = {}
+
+    def write(name, content):
+        if name not in written:
+            path = root / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+            written[name] = path
+
+    def download(name, url):
+        if name not in written:
+            write(name, fetch(url))
+
+    styles, scripts, preload = [], [], []
+    for library in libraries:
+        for name in library.css:
+            url = urljoin(library.base_url, name)
+            css = fetch(url).decode("utf-8")
+            styles.append(vendor_stylesheet(library, url, css, download))
+        for name in library.js:
+            scripts.append(fetch(urljoin(library.base_url, name)).decode("utf-8"))
+        for name in library.preload_fonts:
+            local = local_name(library, urljoin(library.base_url, name))
+            if local in written:
+                preload.append(f"{VENDOR_DIR}/{local}")
+
+    write("bundle.css", minify_css("\n".join(styles)).encode())
+    # Le ";" protège des fichiers qui ne se terminent pas par un point-virgule.
+    write("bundle.js", "\n;\n".join(scripts).encode())
+    write("assets.json", json.dumps({
+        "css": f"{VENDOR_DIR}/bundle.css",
+        "js": f"{VENDOR_DIR}/bundle.js",
+        "preload_fonts": preload,
+    }, indent=2).encode())
+    return sorted(written)
+
+
+# ==========================================
+# 🏷️ LECTURE PAR LES GABARITS
+# ==========================================
+
+@cache
+def get_vendor_manifest():
+    """Contenu de `vendor/assets.json`, ou None si les fichiers n'existent pas."""
+    path = finders.find(MANIFEST_NAME)
+    if not path:
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def get_cdn_urls():
+    """Adresses d'origine, utilisées tant que `vendor_assets` n'a pas été lancé."""
+    css, js = [], []
+    for library in VENDOR_LIBRARIES:
+        css += [urljoin(library.base_url, name) for name in library.css]
+        js += [urljoin(library.base_url, name) for name in library.js]
+    return css, js
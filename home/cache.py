@@ -0,0 +1,309 @@
+"""
+Cache des pages Wagtail.
+
+Les réponses HTML des pages sont gardées dans le cache Django configuré
+(`CACHES`), avec une clé qui dépend du site et du chemin demandé. Seules
+les réponses aux visiteurs anonymes sont gardées : celles des éditeurs
+connectés contiennent leur barre Wagtail. Chaque page a un numéro de version stocké dans
+le cache : publier ou dépublier une page incrémente sa version (et celle de
+ses parents), ce qui rend obsolètes toutes les entrées correspondantes sans
+avoir à les retrouver une par une.
+
+Le même principe sert aux tables presque statiques (réglages, témoignages) :
+leurs lectures sont gardées en cache, partagé entre les workers gunicorn, sous
+une version propre au modèle.
+"""
+
+import hashlib
+import time
+from datetime import date, datetime, time as day_start
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from urllib.parse import parse_qsl, urlencode
+
+from .metrics import record_cache
+
+PAGE_CACHE_PREFIX = "pagecache"
+
+# Paramètres ajoutés par les réseaux sociaux / campagnes : ils ne changent pas
+# le contenu de la page, on les ignore dans la clé de cache.
+IGNORED_QUERY_PARAMS = ("fbclid", "gclid", "igshid", "mc_cid", "mc_eid")
+
+# Durée de vie des lectures de modèles en cache : les anciennes versions
+# finissent par disparaître d'elles-mêmes.
+MODEL_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+# ==========================================
+# 🔢 NUMÉROS DE VERSION
+# ==========================================
+
+def _version_key(name):
+    return f"{PAGE_CACHE_PREFIX}:version:{name}"
+
+
+def get_versions(*names):
+    """
+    Renvoie les versions demandées, dans l'ordre, en un seul aller-retour.
+
+    Une version absente (jamais posée, cache vidé ou entrée évincée quand le
+    cache est plein) reçoit l'heure courante, comme `bump_version` : tout ce
+    qui avait été rangé sous une version perdue devient obsolète, au lieu de
+    revenir sous une valeur par défaut déjà vue. `cache.add` garde la valeur
+    d'un autre worker qui l'aurait posée en même temps.
+    """
+    keys = [_version_key(name) for name in names]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        stamp = time.time_ns()
+        for key in missing:
+            cache.add(key, stamp, timeout=None)
+        found.update(cache.get_many(missing))
+        for key in missing:
+            found.setdefault(key, stamp)
+    return [found[key] for key in keys]
+
+
+def get_version(name):
+    return get_versions(name)[0]
+
+
+def get_page_versions(page_id):
+    """
+    Versions dont dépend la réponse d'une page. La date du jour en fait
+    partie : les pages qui listent les prochains spectacles changent à minuit
+    même sans publication.
+    """
+    return get_versions(f"page:{page_id}", "site") + [date.today().isoformat()]
+
+
+def bump_version(*names):
+    """
+    Invalide tout ce qui dépend de ces versions. On utilise l'horloge plutôt
+    qu'un compteur pour ne jamais revenir à une ancienne valeur si le cache
+    a été vidé entre-temps.
+    """
+    stamp = time.time_ns()
+    cache.set_many({_version_key(name): stamp for name in names}, timeout=None)
+    return stamp
+
+
+# ==========================================
+# 🗝️ CLÉS DE CACHE
+# ==========================================
+
+def get_page_cache_timeout():
+    return getattr(settings, "PAGE_CACHE_TIMEOUT", 60 * 60)
+
+
+def _normalized_query_string(request):
+    params = [
+        (key, value)
+        for key, value in parse_qsl(request.META.get("QUERY_STRING", ""), keep_blank_values=True)
+        if key not in IGNORED_QUERY_PARAMS and not key.startswith("utm_")
+    ]
+    return urlencode(sorted(params))
+
+
+def _visitor_state(request):
+    user = getattr(request, "user", None)
+    return "auth" if user is not None and user.is_authenticated else "anon"
+
+
+def page_cache_key(request):
+    """
+    Clé de cache d'une requête : site (nom d'hôte) et chemin. Renvoie None si
+    la requête ne doit pas passer par le cache, notamment pour un visiteur
+    connecté (la barre Wagtail d'un éditeur ne doit pas être servie à un autre).
+    """
+    if request.method not in ("GET", "HEAD") or not get_page_cache_timeout():
+        return None
+    if _visitor_state(request) != "anon":
+        return None
+    location = hashlib.md5(
+        f"{request.get_host()}|{request.path}|{_normalized_query_string(request)}".encode()
+    ).hexdigest()
+    return f"{PAGE_CACHE_PREFIX}:anon:{location}"
+
+
+def get_cached_response(request):
+    """
+    Renvoie la réponse en cache pour cette requête si elle est toujours à
+    jour, sans aucune requête SQL (ni résolution de l'arbre des pages).
+    """
+    key = page_cache_key(request)
+    if key is None:
+        return None
+    entry = cache.get(key)
+    if entry is None or get_page_versions(entry[0]) != entry[1]:
+        record_cache("page", hit=False)
+        return None
+    page_id, versions, response = entry
+    record_cache("page", hit=True)
+    # Le navigateur a peut-être déjà cette version : 304 sans corps.
+    return get_conditional_response(
+        request,
+        etag=response.get("ETag"),
+        last_modified=parse_http_date_safe(response.get("Last-Modified", "")),
+        response=response,
+    )
+
+
+def is_cacheable(request, response):
+    page = getattr(request, "cached_page", None)
+    if page is None or getattr(request, "is_preview", False):
+        return False
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return False
+    # Un {% csrf_token %} dans le gabarit : la réponse dépend du visiteur.
+    if request.META.get("CSRF_COOKIE_NEEDS_UPDATE"):
+        return False
+    cache_control = response.get("Cache-Control", "")
+    return "private" not in cache_control and "no-cache" not in cache_control
+
+
+def store_response(request, response):
+    key = page_cache_key(request)
+    if key is None or not is_cacheable(request, response):
+        return
+    page_id = request.cached_page.pk
+    # Versions relues au moment du rendu : une publication concurrente rendra
+    # cette entrée obsolète au lieu d'être masquée par elle.
+    versions = request.cached_page_versions
+    cache.set(key, (page_id, versions, response), get_page_cache_timeout())
+
+
+# ==========================================
+# 🏷️ ETAG / LAST-MODIFIED
+# ==========================================
+
+def get_page_validators(page, request, versions):
+    """
+    ETag et date de dernière modification d'une page. Ils changent quand la
+    page (ou une page enfant) est publiée, quand les réglages ou témoignages
+    changent, et à minuit (prochains spectacles).
+
+    Les versions sont des horodatages qui ne reviennent jamais en arrière,
+    même après la perte d'une entrée du cache (voir `get_versions`) : un ETag
+    déjà envoyé ne peut pas correspondre de nouveau à un contenu plus récent.
+    """
+    state = _visitor_state(request)
+    etag = hashlib.md5(
+        f"{page.pk}|{page.last_published_at}|{versions}|{state}".encode()
+    ).hexdigest()
+
+    page_version, site_version, today = versions
+    stamps = [
+        page_version / 1e9,
+        site_version / 1e9,
+        datetime.combine(date.fromisoformat(today), day_start()).timestamp(),
+    ]
+    if page.last_published_at:
+        stamps.append(page.last_published_at.timestamp())
+    return f'"{etag}"', int(max(stamps))
+
+
+# ==========================================
+# 🧩 MIXIN POUR LES PAGES
+# ==========================================
+
+class PageCacheMixin:
+    """
+    À placer avant `Page` dans les classes parentes d'un modèle de page pour
+    que `PageCacheMiddleware` garde ses réponses en cache, et pour répondre
+    aux requêtes conditionnelles (If-None-Match / If-Modified-Since) par un
+    304 sans rendre le gabarit.
+    """
+
+    def serve(self, request, *args, **kwargs):
+        versions = get_page_versions(self.pk)
+        request.cached_page = self
+        request.cached_page_versions = versions
+
+        if request.method not in ("GET", "HEAD") or getattr(request, "is_preview", False):
+            return super().serve(request, *args, **kwargs)
+
+        etag, last_modified = get_page_validators(self, request, versions)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().serve(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response.headers.setdefault("ETag", etag)
+            response.headers.setdefault("Last-Modified", http_date(last_modified))
+            # Le navigateur doit revalider à chaque visite (requête légère grâce au 304).
+            patch_cache_control(response, max_age=0, must_revalidate=True)
+        return response
+
+
+# ==========================================
+# 🗃️ RÉGLAGES ET SNIPPETS EN CACHE
+# ==========================================
+
+def model_version_name(model):
+    return f"model:{model._meta.label_lower}"
+
+
+def get_cached_model_data(model, name, loader):
+    """
+    Renvoie `loader()` depuis le cache, sous la version courante du modèle.
+    Une écriture concurrente change la version : une valeur lue avant elle
+    est rangée sous l'ancienne clé et n'est jamais relue.
+    """
+    version = get_version(model_version_name(model))
+    key = f"{PAGE_CACHE_PREFIX}:model:{model._meta.label_lower}:{name}:{version}"
+    value = cache.get(key)
+    record_cache("model", hit=value is not None)
+    if value is None:
+        value = loader()
+        cache.set(key, value, MODEL_CACHE_TIMEOUT)
+    return value
+
+
+def get_cached_queryset(queryset, name="all"):
+    """Liste des objets du queryset, lue une fois pour tous les workers."""
+    return get_cached_model_data(queryset.model, name, lambda: list(queryset))
+
+
+class CachedGenericSettingMixin:
+    """
+    À placer avant `BaseGenericSetting` : `Setting.load()` (et donc
+    `{{ settings.app.Setting }}` dans les gabarits) ne fait plus de requête.
+    """
+
+    @classmethod
+    def _get_or_create(cls):
+        return get_cached_model_data(cls, "instance", super()._get_or_create)
+
+
+# ==========================================
+# 🧹 INVALIDATION
+# ==========================================
+
+def purge_page(page):
+    """
+    Invalide la page et tous ses parents (la page d'accueil affiche par
+    exemple un lien vers la page Spectacles).
+    """
+    page_ids = page.get_ancestors(inclusive=True).values_list("pk", flat=True)
+    bump_version(*(f"page:{pk}" for pk in page_ids))
+
+
+def purge_site():
+    """Invalide toutes les pages (réglages ou snippets partagés modifiés)."""
+    bump_version("site")
+
+
+def purge_model(model):
+    """
+    Invalide les lectures en cache d'un modèle et toutes les pages. On
+    recommence après le commit : un autre worker a pu remettre en cache les
+    anciennes données pendant la transaction.
+    """
+    names = (model_version_name(model), "site")
+    bump_version(*names)
+    transaction.on_commit(lambda: bump_version(*names))
@@ -0,0 +1,236 @@
+"""
+CSS critique par type de page.
+
+Les styles propres à chaque gabarit de page sont dans `static/css/pages/`.
+`manage.py build_css` :
+
+- regroupe les règles présentes dans plusieurs de ces fichiers dans un
+  `shared.css` commun (téléchargé une fois, puis en cache pour tout le site) ;
+- calcule pour chaque gabarit le CSS "critique" : les règles de `base.css`
+  et de la page qui s'appliquent à l'en-tête et au premier bloc du contenu,
+  c'est-à-dire à ce qui est visible sans défiler. Les sélecteurs sont testés
+  sur le squelette HTML des gabarits (BeautifulSoup / soupsieve).
+
+La balise `{% page_styles %}` insère ce CSS critique dans le <head> et charge
+le reste sans bloquer l'affichage.
+"""
+
+import json
+import re
+from functools import cache
+from pathlib import Path
+
+import tinycss2
+from bs4 import BeautifulSoup, Tag
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.template import engines
+
+from wagtail.models import get_page_models
+
+from .assets import minify_css
+
+BUILD_DIR = "css/build"
+BUILD_MANIFEST = f"{BUILD_DIR}/manifest.json"
+PAGE_STYLESHEET_DIR = "css/pages"
+GLOBAL_STYLESHEETS = ["css/base.css"]
+BASE_TEMPLATE = "base.html"
+
+# Nombre de blocs du contenu considérés comme visibles sans défiler.
+ABOVE_THE_FOLD_ELEMENTS = 1
+
+DJANGO_TAG_RE = re.compile(r"\{%.*?%\}|\{#.*?#\}", re.S)
+DJANGO_VARIABLE_RE = re.compile(r"\{\{.*?\}\}", re.S)
+CONTENT_BLOCK_RE = re.compile(r"\{%\s*block content\s*%\}(.*)\{%\s*endblock", re.S)
+
+# États et pseudo-éléments sans équivalent dans un document statique : on les
+# retire du sélecteur avant de le tester ("a:hover" -> "a").
+IGNORED_PSEUDO_RE = re.compile(
+    r"::?(?:hover|focus|focus-within|focus-visible|active|visited|link|target|"
+    r"before|after|first-letter|first-line|placeholder|selection|marker|"
+    r"-webkit-[\w-]+|-moz-[\w-]+)(?![\w-])"
+)
+
+
+def get_build_root():
+    return Path(settings.PROJECT_DIR) / "static" / BUILD_DIR
+
+
+def page_key(template_name):
+    """"home/home_page.html" -> "home_page"."""
+    return Path(template_name).stem
+
+
+def page_stylesheet(template_name):
+    return f"{PAGE_STYLESHEET_DIR}/{page_key(template_name)}.css"
+
+
+def read_static(name):
+    path = finders.find(name)
+    return Path(path).read_text(encoding="utf-8") if path else ""
+
+
+def get_page_templates():
+    """Gabarits des types de page qui ont une feuille de style propre."""
+    templates = {model.template for model in get_page_models() if isinstance(model.template, str)}
+    return sorted(name for name in templates if finders.find(page_stylesheet(name)))
+
+
+# ==========================================
+# 🧩 RÈGLES CSS
+# ==========================================
+
+def parse_rules(css):
+    return [
+        rule
+        for rule in tinycss2.parse_stylesheet(css, skip_comments=True, skip_whitespace=True)
+        if rule.type in ("qualified-rule", "at-rule")
+    ]
+
+
+def rule_text(rule):
+    return minify_css(tinycss2.serialize([rule]))
+
+
+def split_shared_rules(stylesheets):
+    """
+    Sépare les règles présentes dans au moins deux feuilles ({nom: css}).
+    Renvoie (règles communes, {nom: règles propres}).
+    """
+    parsed = {name: [(rule_text(rule), rule) for rule in parse_rules(css)] for name, css in stylesheets.items()}
+    seen_in = {}
+    for name, rules in parsed.items():
+        for text, _ in rules:
+            seen_in.setdefault(text, set()).add(name)
+
+    shared, shared_texts, own = [], set(), {}
+    for name, rules in parsed.items():
+        own[name] = []
+        for text, rule in rules:
+            if len(seen_in[text]) > 1:
+                if text not in shared_texts:
+                    shared_texts.add(text)
+                    shared.append(rule)
+            else:
+                own[name].append(rule)
+    return shared, own
+
+
+# ==========================================
+# 👀 AU-DESSUS DE LA LIGNE DE FLOTTAISON
+# ==========================================
+
+def _template_source(template_name):
+    template = engines["django"].engine.get_template(template_name)
+    return template.source
+
+
+def _strip_django(source):
+    return DJANGO_VARIABLE_RE.sub("x", DJANGO_TAG_RE.sub("", source))
+
+
+def above_the_fold_document(template_name):
+    """
+    Squelette HTML de ce qui s'affiche sans défiler : l'en-tête du site et le
+    premier bloc du contenu de la page.
+    """
+    base = BeautifulSoup(_strip_django(_template_source(BASE_TEMPLATE)), "html.parser")
+    header = base.find("header") or ""
+
+    match = CONTENT_BLOCK_RE.search(_template_source(template_name))
+    content = BeautifulSoup(_strip_django(match.group(1) if match else ""), "html.parser")
+    first_elements = [child for child in content.children if isinstance(child, Tag)][:ABOVE_THE_FOLD_ELEMENTS]
+
+    fragment = "".join(str(element) for element in first_elements)
+    return BeautifulSoup(f"<html><body>{header}<main>{fragment}</main></body></html>", "html.parser")
+
+
+def selector_matches(document, selector):
+    selector = IGNORED_PSEUDO_RE.sub("", selector).strip() or "*"
+    try:
+        return document.select_one(selector) is not None
+    except Exception:
+        # Sélecteur non géré par soupsieve : on le garde, par prudence.
+        return True
+
+
+def critical_rules(rules, document):
+    critical = []
+    for rule in rules:
+        if rule.type == "qualified-rule":
+            selectors = tinycss2.serialize(rule.prelude).split(",")
+            if any(selector_matches(document, selector) for selector in selectors):
+                critical.append(tinycss2.serialize([rule]))
+        elif rule.lower_at_keyword == "media":
+            nested = critical_rules(parse_rules(tinycss2.serialize(rule.content)), document)
+            if nested:
+                critical.append(f"@media {tinycss2.serialize(rule.prelude).strip()}{{{''.join(nested)}}}")
+    return critical
+
+
+def keyframes_for(css, rules):
+    """Animations utilisées par le CSS critique (sinon l'élément reste à son état initial)."""
+    return [
+        tinycss2.serialize([rule])
+        for rule in rules
+        if rule.type == "at-rule"
+        and rule.lower_at_keyword.endswith("keyframes")
+        and re.search(rf"\b{re.escape(tinycss2.serialize(rule.prelude).strip())}\b", css)
+    ]
+
+
+# ==========================================
+# 🏗️ CONSTRUCTION
+# ==========================================
+
+def build_page_css(root=None):
+    """Écrit les feuilles partagées, propres et critiques. Renvoie le manifeste."""
+    root = Path(root or get_build_root())
+    templates = get_page_templates()
+    sources = {name: read_static(page_stylesheet(name)) for name in templates}
+    shared, own = split_shared_rules(sources)
+    global_rules = [rule for name in GLOBAL_STYLESHEETS for rule in parse_rules(read_static(name))]
+
+    def write(name, rules_css):
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(minify_css("".join(rules_css)), encoding="utf-8")
+        return f"{BUILD_DIR}/{name}"
+
+    manifest = {
+        "global": GLOBAL_STYLESHEETS,
+        "shared": write("shared.css", [tinycss2.serialize([rule]) for rule in shared]) if shared else None,
+        "pages": {},
+    }
+    for name in templates:
+        page_rules = shared + own[name]
+        document = above_the_fold_document(name)
+        critical = critical_rules(global_rules, document) + critical_rules(page_rules, document)
+        critical += keyframes_for("".join(critical), global_rules + page_rules)
+        key = page_key(name)
+        manifest["pages"][name] = {
+            "css": write(f"pages/{key}.css", [tinycss2.serialize([rule]) for rule in own[name]]),
+            "critical": write(f"critical/{key}.css", critical),
+        }
+
+    (root / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+# ==========================================
+# 🏷️ LECTURE PAR LES GABARITS
+# ==========================================
+
+@cache
+def get_build_manifest():
+    """Contenu de `css/build/manifest.json`, ou None avant le premier `build_css`."""
+    path = finders.find(BUILD_MANIFEST)
+    if not path:
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+@cache
+def get_critical_css(name):
+    return read_static(name)
@@ -0,0 +1,189 @@
+"""
+Envoi des documents (dossiers de presse PDF, archives zip).
+
+Remplace la vue `wagtaildocs_serve` pour les documents stockés sur disque :
+mêmes contrôles (nom de fichier, restrictions de collection via les hooks
+`before_serve_document`, signal `document_served`), mais le transfert des
+octets ne passe plus par une boucle Python.
+
+- `DOCUMENTS_SENDFILE = "nginx"` : la réponse ne contient qu'un en-tête
+  `X-Accel-Redirect` ; nginx envoie le fichier (Range, reprise...) et le
+  worker est libéré tout de suite. Configuration nginx correspondante :
+
+      location /protected-media/ {
+          internal;
+          alias /app/media/;
+      }
+
+- `DOCUMENTS_SENDFILE = "xsendfile"` : même principe avec `X-Sendfile`
+  (Apache mod_xsendfile, lighttpd).
+- Sans proxy (par défaut) : Django répond lui-même, avec les requêtes
+  conditionnelles (ETag, If-Modified-Since) et les requêtes partielles
+  (`Range`, `If-Range`) pour reprendre un téléchargement. Le fichier est
+  passé à gunicorn tel quel, positionné au début de l'intervalle :
+  gunicorn l'envoie avec `os.sendfile` (sans copie en mémoire).
+
+Les documents d'un stockage distant (sans chemin local) restent servis par
+la vue de Wagtail.
+"""
+
+import os
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from wagtail import hooks
+from wagtail.documents import get_document_model
+from wagtail.documents.models import document_served
+from wagtail.documents.views.serve import serve as wagtail_serve
+
+SENDFILE_HEADERS = {
+    "nginx": "X-Accel-Redirect",
+    "xsendfile": "X-Sendfile",
+}
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_range(header, size):
+    """
+    (début, fin incluse) demandés par un en-tête `Range: bytes=...`, ou None
+    pour envoyer tout le fichier (pas d'en-tête, en-tête mal formé, plusieurs
+    intervalles). Lève RangeNotSatisfiable si l'intervalle est hors du fichier.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start, sep, end = header[len("bytes="):].strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if start:
+            start, end = int(start), int(end) if end else size - 1
+        else:
+            # "bytes=-500" : les 500 derniers octets.
+            start, end = max(size - int(end), 0), size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    if start < 0 or start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+class FileRange:
+    """
+    Partie d'un fichier ouvert. `fileno()` et la position du fichier
+    suffisent à gunicorn pour l'envoyer avec `os.sendfile` (la longueur vient
+    de `Content-Length`) ; `read()` sert aux autres serveurs.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+# ==========================================
+# 📤 RÉPONSES
+# ==========================================
+
+def offload_response(path, mode):
+    """Réponse vide : le proxy envoie lui-même le fichier."""
+    response = HttpResponse()
+    if mode == "nginx":
+        root = os.path.abspath(getattr(settings, "DOCUMENTS_SENDFILE_ROOT", settings.MEDIA_ROOT))
+        relative = os.path.relpath(path, root)
+        url = getattr(settings, "DOCUMENTS_SENDFILE_URL", "/protected-media/")
+        response[SENDFILE_HEADERS[mode]] = url + quote(relative.replace(os.sep, "/"))
+    else:
+        response[SENDFILE_HEADERS[mode]] = path
+    return response
+
+
+def file_response(request, path, size, validators):
+    """Fichier entier (200) ou intervalle demandé (206), envoyé par le serveur WSGI."""
+    if_range = request.headers.get("If-Range")
+    ranged = if_range is None or if_range in validators
+    try:
+        byte_range = parse_range(request.headers.get("Range"), size) if ranged else None
+    except RangeNotSatisfiable:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    if byte_range is None:
+        return FileResponse(open(path, "rb"))
+    start, end = byte_range
+    response = FileResponse(FileRange(open(path, "rb"), start, end - start + 1), status=206)
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Content-Length"] = end - start + 1
+    return response
+
+
+# ==========================================
+# 📄 VUE
+# ==========================================
+
+def serve_document(request, document_id, document_filename):
+    document = get_object_or_404(get_document_model(), id=document_id)
+    if document.filename != document_filename:
+        raise Http404("This document does not match the given filename.")
+    try:
+        path = document.file.path
+    except NotImplementedError:
+        path = None
+    if path is None or getattr(settings, "WAGTAILDOCS_SERVE_METHOD", None) in ("redirect", "direct"):
+        return wagtail_serve(request, document_id, document_filename)
+
+    for fn in hooks.get_hooks("before_serve_document"):
+        result = fn(document, request)
+        if isinstance(result, HttpResponse):
+            return result
+
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise Http404(f"{document.file.name} does not exist")
+    etag = quote_etag(document.file_hash) if document.file_hash else None
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        document_served.send(sender=type(document), instance=document, request=request)
+        mode = getattr(settings, "DOCUMENTS_SENDFILE", None)
+        if mode:
+            response = offload_response(path, mode)
+        else:
+            validators = {etag, http_date(last_modified)} - {None}
+            response = file_response(request, path, stat.st_size, validators)
+        if response.status_code != 416:
+            response["Content-Type"] = document.content_type
+            response["Content-Disposition"] = document.content_disposition
+        response["Accept-Ranges"] = "bytes"
+
+    if etag:
+        response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    if getattr(settings, "WAGTAILDOCS_BLOCK_EMBEDDED_CONTENT", True):
+        response["Content-Security-Policy"] = "default-src 'none'"
+    response["X-Content-Type-Options"] = "nosniff"
+    return response
@@ -0,0 +1,271 @@
+"""
+Export statique du site.
+
+`manage.py export_static` rend chaque page publiée et publique du site par
+défaut comme le ferait un visiteur anonyme et l'écrit, avec ses copies
+`.br` / `.gz`, dans `STATIC_EXPORT_DIR` (`/spectacles/` ->
+`spectacles/index.html`). Les images
+(renditions) et documents publics référencés par les pages y sont copiés
+sous les mêmes chemins (`media/...`, `documents/<id>/<nom>`).
+
+Les pages dont la réponse dépend du visiteur (formulaire de contact : jeton
+CSRF, cookies) ne sont pas exportées, pas plus que `/search/` : le serveur
+web les passe à Django. Les images et documents copiés sont retirés de
+l'export quand leur fichier source disparaît (image ou document supprimé,
+rendition effacée par `cleanup_media`, document devenu privé). Exemple avec nginx (`gzip_static` / `brotli_static`
+servent les copies compressées) :
+
+    location / {
+        root /app/export;
+        try_files $uri $uri/index.html @django;
+    }
+
+Quand `STATIC_EXPORT_DIR` est défini, chaque publication ré-exporte la page
+et ses parents en tâche de fond ; un déplacement ou un changement des
+réglages / témoignages ré-exporte tout le site. Les pages qui listent les
+prochains spectacles changent à minuit : relancer `export_static` chaque nuit.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import tempfile
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import unquote, unquote_to_bytes, urlsplit
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.handlers.base import BaseHandler
+from django.core.handlers.wsgi import WSGIRequest
+
+from wagtail.contrib.forms.models import AbstractForm
+from wagtail.documents import get_document_model
+from wagtail.models import Page, Site
+
+from .staticfiles import compress_file
+
+logger = logging.getLogger(__name__)
+
+EXPORT_MANIFEST = ".export.json"
+DOCUMENT_URL_RE = re.compile(r"""/documents/(\d+)/([^\s"'<>?#]+)""")
+
+
+def get_export_dir():
+    """Dossier de l'export statique, ou None s'il est désactivé."""
+    export_dir = getattr(settings, "STATIC_EXPORT_DIR", None)
+    return Path(export_dir) if export_dir else None
+
+
+def export_path(url_path):
+    """Fichier d'une page : "/spectacles/" -> "spectacles/index.html"."""
+    path = unquote(url_path).strip("/")
+    return f"{path}/index.html" if path else "index.html"
+
+
+def page_and_ancestor_ids(page):
+    """La page et ses parents, dont les gabarits peuvent afficher des liens vers elle."""
+    return [page.pk, *Page.objects.ancestor_of(page).values_list("pk", flat=True)]
+
+
+def get_exported_pages():
+    """Pages publiques du site par défaut (l'export est un seul arbre de fichiers)."""
+    site = Site.objects.filter(is_default_site=True).select_related("root_page").first()
+    if site is None:
+        return Page.objects.none()
+    return site.root_page.get_descendants(inclusive=True).live().public().specific()
+
+
+def _media_url_re():
+    return re.compile(rf"""{re.escape(settings.MEDIA_URL)}([^\s"'<>),]+)""")
+
+
+class ExportHandler(BaseHandler):
+    """
+    Passe une requête GET anonyme dans la pile de middlewares et les vues,
+    comme le serveur WSGI, sans socket ni client de test.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.load_middleware()
+
+    def get(self, root_url, url_path):
+        """(requête, réponse) pour `url_path` sur le site de `root_url`."""
+        url = urlsplit(root_url)
+        scheme = url.scheme or "http"
+        request = WSGIRequest({
+            "REQUEST_METHOD": "GET",
+            "SCRIPT_NAME": "",
+            # Comme un serveur WSGI : chemin décodé, octets en latin-1.
+            "PATH_INFO": unquote_to_bytes(url_path).decode("iso-8859-1"),
+            "QUERY_STRING": "",
+            "HTTP_HOST": url.netloc,
+            "SERVER_NAME": url.hostname,
+            "SERVER_PORT": str(url.port or (443 if scheme == "https" else 80)),
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scheme,
+            "wsgi.input": BytesIO(),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multiprocess": True,
+            "wsgi.multithread": False,
+            "wsgi.run_once": False,
+        })
+        # Les exceptions des vues deviennent des réponses 500, journalisées par Django.
+        return request, self.get_response(request)
+
+
+class StaticExport:
+    def __init__(self, root):
+        self.root = Path(root)
+        self.manifest_path = self.root / EXPORT_MANIFEST
+        self.handler = None
+        try:
+            manifest = json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            manifest = {}
+        # id de page -> fichier ; fichiers du stockage copiés sous media/ ;
+        # id de document -> nom du fichier copié sous documents/<id>/.
+        self.pages = manifest.get("pages", {})
+        self.media = set(manifest.get("media", []))
+        self.documents = manifest.get("documents", {})
+
+    # ==========================================
+    # 📝 ÉCRITURE DES FICHIERS
+    # ==========================================
+
+    def write(self, name, data):
+        """Écrit un fichier d'un coup : le serveur web ne voit jamais de fichier à moitié écrit."""
+        target = self.root / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=target.parent, prefix=".export-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, target)
+        return target
+
+    def copy(self, name, source):
+        """Copie un fichier du stockage des médias, s'il n'est pas déjà exporté."""
+        target = self.root / name
+        if target.exists() and target.stat().st_size == source.size:
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with source.open("rb") as f, open(target, "wb") as out:
+            shutil.copyfileobj(f, out)
+
+    def delete(self, name):
+        for path in (self.root / name, self.root / f"{name}.br", self.root / f"{name}.gz"):
+            path.unlink(missing_ok=True)
+
+    def save_manifest(self):
+        manifest = {"pages": self.pages, "media": sorted(self.media), "documents": self.documents}
+        self.write(EXPORT_MANIFEST, json.dumps(manifest, indent=2).encode())
+
+    # ==========================================
+    # 🖼️ IMAGES ET DOCUMENTS
+    # ==========================================
+
+    def export_media(self, html):
+        """Copie les images et documents publics référencés par une page."""
+        for name in set(_media_url_re().findall(html)):
+            name = unquote(name)
+            if default_storage.exists(name):
+                self.copy(f"media/{name}", default_storage.open(name))
+                self.media.add(name)
+
+        documents = {int(pk): unquote(filename) for pk, filename in DOCUMENT_URL_RE.findall(html)}
+        for document in get_document_model().objects.filter(pk__in=documents).select_related("collection"):
+            # Les documents à accès restreint restent servis (et vérifiés) par Django.
+            if document.collection.get_view_restrictions().exists():
+                continue
+            if documents[document.pk] == document.filename:
+                self.copy(f"documents/{document.pk}/{document.filename}", document.file)
+                self.documents[str(document.pk)] = document.filename
+
+    def prune_files(self):
+        """Retire les images et documents copiés dont la source n'existe plus (ou n'est plus publique)."""
+        for name in [name for name in self.media if not default_storage.exists(name)]:
+            self.delete(f"media/{name}")
+            self.media.discard(name)
+
+        public = {
+            str(document.pk): document.filename
+            for document in get_document_model().objects.filter(pk__in=self.documents).select_related("collection")
+            if not document.collection.get_view_restrictions().exists()
+        }
+        for pk, filename in list(self.documents.items()):
+            if public.get(pk) != filename:
+                self.delete(f"documents/{pk}/{filename}")
+                del self.documents[pk]
+
+    # ==========================================
+    # 📄 PAGES
+    # ==========================================
+
+    def render(self, page, url_path, root_url):
+        """Réponse de la page pour un visiteur anonyme, ou None si elle n'est pas exportable."""
+        if isinstance(page, AbstractForm):
+            return None
+        if self.handler is None:
+            self.handler = ExportHandler()
+        request, response = self.handler.get(root_url, url_path)
+        if response.status_code != 200:
+            logger.warning("Page %s (%s) non exportée : réponse %s", page.pk, url_path, response.status_code)
+            return None
+        # Un {% csrf_token %} ou un cookie : la réponse dépend du visiteur.
+        if response.streaming or response.cookies or request.META.get("CSRF_COOKIE_NEEDS_UPDATE"):
+            return None
+        return response
+
+    def export_page(self, page):
+        """Exporte une page publiée. Renvoie True si elle a été écrite."""
+        url_parts = page.get_url_parts()
+        response = self.render(page, url_parts[2], url_parts[1]) if url_parts else None
+        if response is None:
+            self.remove_page(page.pk)
+            return False
+
+        name = export_path(url_parts[2])
+        previous = self.pages.get(str(page.pk))
+        if previous and previous != name:
+            self.delete(previous)
+        self.export_media(response.content.decode(response.charset or "utf-8"))
+        compress_file(self.write(name, response.content))
+        self.pages[str(page.pk)] = name
+        return True
+
+    def remove_page(self, page_id):
+        name = self.pages.pop(str(page_id), None)
+        if name:
+            self.delete(name)
+
+    def export_pages(self, page_ids):
+        """Ré-exporte ces pages si elles sont publiées, les retire de l'export sinon."""
+        pages = get_exported_pages().in_bulk(page_ids)
+        exported = 0
+        for page_id in page_ids:
+            page = pages.get(page_id)
+            if page is None:
+                self.remove_page(page_id)
+            else:
+                exported += self.export_page(page)
+        self.prune_files()
+        self.save_manifest()
+        return exported
+
+    def export_site(self):
+        """Exporte toutes les pages publiques et retire celles qui ne le sont plus."""
+        exported = set()
+        for page in get_exported_pages().iterator():
+            if self.export_page(page):
+                exported.add(str(page.pk))
+        for page_id in set(self.pages) - exported:
+            self.remove_page(page_id)
+        self.prune_files()
+        self.save_manifest()
+        return len(exported)
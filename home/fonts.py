@@ -0,0 +1,128 @@
+"""
+Sous-ensembles de polices, générés au `collectstatic`.
+
+Le site n'affiche qu'une poignée d'icônes Font Awesome (réseaux sociaux,
+enveloppe...) : les classes `fa-*` présentes dans les gabarits sont relevées,
+les règles CSS des autres icônes sont retirées de `vendor/bundle.css` et les
+polices d'icônes ne gardent que les glyphes utilisés. Les polices de texte
+(Permanent Marker) sont réduites aux caractères du français.
+
+Le travail porte sur les copies de STATIC_ROOT, avant que le stockage
+n'ajoute les empreintes : les fichiers de `static/vendor/` restent complets.
+"""
+
+import logging
+import re
+from pathlib import Path
+
+from fontTools import subset
+from fontTools.ttLib import TTFont
+
+from .assets import VENDOR_DIR
+from .renditions import get_template_dirs
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_CSS = f"{VENDOR_DIR}/bundle.css"
+ICON_FONT_DIR = f"{VENDOR_DIR}/fontawesome/"
+TEXT_FONT_DIR = f"{VENDOR_DIR}/fonts/"
+FONT_EXTENSIONS = (".woff2", ".woff", ".ttf", ".otf")
+
+# Classes Font Awesome qui ne sont pas des icônes (styles, tailles, effets).
+FA_MODIFIERS = {
+    "solid", "regular", "brands", "light", "thin", "duotone", "fw", "lg", "sm",
+    "xs", "2xs", "xl", "2xl", "1x", "2x", "3x", "4x", "5x", "spin", "pulse",
+    "beat", "fade", "bounce", "shake", "flip", "border", "inverse", "stack",
+    "stack-1x", "stack-2x", "ul", "li", "rotate-90", "rotate-180", "rotate-270",
+    "flip-horizontal", "flip-vertical", "pull-left", "pull-right",
+}
+ICON_CLASS_RE = re.compile(r"\bfa-([a-z0-9-]+)")
+
+# Règles d'icônes telles que les écrit `minify_css`.
+ICON_RULE_RE = re.compile(r'((?:\.fa-[\w-]+::?before,?)+)\{content:"\\([0-9a-fA-F]+)"\}')
+
+# Latin de base, Latin-1 (accents français), Œ/œ, Ÿ et la ponctuation typographique.
+TEXT_UNICODES = (
+    set(range(0x20, 0x7F)) | set(range(0xA0, 0x100))
+    | {0x152, 0x153, 0x178, 0x2013, 0x2014, 0x2018, 0x2019, 0x201C, 0x201D, 0x2026, 0x20AC}
+)
+
+
+def find_used_icons():
+    """Noms des icônes (`instagram`, `envelope`...) utilisées par les gabarits."""
+    icons = set()
+    for template_dir in get_template_dirs():
+        for path in template_dir.rglob("*.html"):
+            icons.update(ICON_CLASS_RE.findall(path.read_text(encoding="utf-8")))
+    return icons - FA_MODIFIERS
+
+
+def prune_icon_rules(css, icons):
+    """
+    Retire de la feuille de style les règles des icônes inutilisées. Renvoie
+    (feuille réduite, points de code des icônes gardées).
+    """
+    codepoints = set()
+
+    def replace(match):
+        names = set(re.findall(r"\.fa-([\w-]+)", match.group(1)))
+        if names & icons:
+            codepoints.add(int(match.group(2), 16))
+            return match.group()
+        return ""
+
+    return ICON_RULE_RE.sub(replace, css), codepoints
+
+
+def subset_font(path, unicodes):
+    """Réduit une police, en place, aux caractères donnés (même format)."""
+    flavor = TTFont(path, lazy=True).flavor
+    options = subset.Options()
+    options.flavor = flavor
+    options.layout_features = ["*"]
+    options.notdef_outline = True
+    font = subset.load_font(path, options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=unicodes)
+    subsetter.subset(font)
+    subset.save_font(font, path, options)
+    font.close()
+
+
+def subset_static_fonts(storage, paths):
+    """
+    Réduit le CSS des icônes et les polices parmi les fichiers collectés
+    (`paths` : noms relatifs à STATIC_ROOT). Renvoie le nombre d'octets gagnés.
+    """
+    before = after = 0
+
+    icon_codepoints = None
+    if BUNDLE_CSS in paths:
+        css_path = Path(storage.path(BUNDLE_CSS))
+        css = css_path.read_text(encoding="utf-8")
+        pruned, icon_codepoints = prune_icon_rules(css, find_used_icons())
+        if pruned == css and not icon_codepoints:
+            # Format inattendu : mieux vaut des polices complètes que des icônes vides.
+            logger.warning("Aucune règle d'icône reconnue dans %s, polices d'icônes gardées entières", BUNDLE_CSS)
+            icon_codepoints = None
+        else:
+            before += len(css.encode())
+            after += len(pruned.encode())
+            css_path.write_text(pruned, encoding="utf-8")
+
+    for name in sorted(paths):
+        if not name.endswith(FONT_EXTENSIONS):
+            continue
+        if name.startswith(ICON_FONT_DIR):
+            unicodes = icon_codepoints
+        elif name.startswith(TEXT_FONT_DIR):
+            unicodes = TEXT_UNICODES
+        else:
+            continue
+        if unicodes is None:
+            continue
+        path = Path(storage.path(name))
+        before += path.stat().st_size
+        subset_font(str(path), unicodes)
+        after += path.stat().st_size
+    return before - after
@@ -0,0 +1,102 @@
+import random
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+from wagtail.models import Page
+
+from home.models import Show
+
+SCRATCH_TABLE = "home_benchmark_scratch"
+
+CREATE_TABLE = {
+    "sqlite": f"CREATE TABLE {SCRATCH_TABLE} (id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT NOT NULL)",
+    "postgresql": f"CREATE TABLE {SCRATCH_TABLE} (id SERIAL PRIMARY KEY, payload TEXT NOT NULL)",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure la base sous charge concurrente : des threads lisent des pages et des "
+        "spectacles pendant que d'autres écrivent (comme des envois du formulaire de "
+        "contact). Lancer avec différentes DATABASE_URL pour comparer SQLite et PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8, help="Nombre de threads (défaut : 8).")
+        parser.add_argument("--duration", type=float, default=10, help="Durée en secondes (défaut : 10).")
+        parser.add_argument(
+            "--write-ratio",
+            type=float,
+            default=0.1,
+            help="Part des opérations qui écrivent (défaut : 0.1).",
+        )
+        parser.add_argument("--database", default="default", help="Alias de la base (défaut : default).")
+
+    def handle(self, *args, **options):
+        alias = options["database"]
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            cursor.execute(CREATE_TABLE[connection.vendor])
+
+        results = {"lecture": [], "écriture": []}
+        errors = {"lecture": 0, "écriture": 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options["duration"]
+
+        def worker():
+            timings = {"lecture": [], "écriture": []}
+            failures = {"lecture": 0, "écriture": 0}
+            try:
+                while time.monotonic() < deadline:
+                    kind = "écriture" if random.random() < options["write_ratio"] else "lecture"
+                    start = time.perf_counter()
+                    try:
+                        if kind == "lecture":
+                            list(Page.objects.using(alias).live().public().filter(depth__gt=1)[:20])
+                            list(Show.objects.using(alias).live().upcoming()[:20])
+                        else:
+                            with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+                                cursor.execute(f"INSERT INTO {SCRATCH_TABLE} (payload) VALUES (%s)", ["x" * 500])
+                    except OperationalError:
+                        failures[kind] += 1
+                        continue
+                    timings[kind].append(time.perf_counter() - start)
+            finally:
+                connections[alias].close()
+            with lock:
+                for kind in results:
+                    results[kind] += timings[kind]
+                    errors[kind] += failures[kind]
+
+        threads = [threading.Thread(target=worker) for _ in range(options["threads"])]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE {SCRATCH_TABLE}")
+
+        settings_dict = connection.settings_dict
+        self.stdout.write(
+            f"{connection.vendor} ({settings_dict['NAME']}), {options['threads']} threads, "
+            f"{options['duration']:g} s, CONN_MAX_AGE={settings_dict['CONN_MAX_AGE']}"
+        )
+        for kind, timings in results.items():
+            self.stdout.write(self.format_line(kind, timings, errors[kind], options["duration"]))
+
+    def format_line(self, kind, timings, error_count, duration):
+        if not timings:
+            return f"  {kind:9} aucune opération réussie, {error_count} erreur(s)"
+        timings = sorted(timings)
+        quantiles = statistics.quantiles(timings, n=100) if len(timings) > 1 else timings * 99
+        return (
+            f"  {kind:9} {len(timings) / duration:8.0f} op/s   "
+            f"p50 {quantiles[49] * 1000:6.1f} ms   p95 {quantiles[94] * 1000:6.1f} ms   "
+            f"p99 {quantiles[98] * 1000:6.1f} ms   {error_count} erreur(s)"
+        )
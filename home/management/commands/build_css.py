@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from home.critical_css import build_page_css, get_build_root
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcule le CSS critique de chaque type de page et regroupe les styles communs "
+        "aux pages dans static/css/build/. Lancer ensuite collectstatic."
+    )
+
+    def handle(self, *args, **options):
+        manifest = build_page_css()
+        if options["verbosity"] > 1:
+            for name, page in manifest["pages"].items():
+                self.stdout.write(f"  {name} -> {page['critical']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(manifest['pages'])} types de page traités dans {get_build_root()}"
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from home.press_kit import build_press_kit, get_press_kit
+
+
+class Command(BaseCommand):
+    help = (
+        "Régénère le dossier de presse PDF (WeasyPrint) si son contenu a changé. "
+        "À lancer chaque nuit : les spectacles passés en disparaissent."
+    )
+
+    def handle(self, *args, **options):
+        document = build_press_kit()
+        if document is not None:
+            self.stdout.write(self.style.SUCCESS(f"Dossier de presse généré : {document.file.name}"))
+        elif get_press_kit() is not None:
+            self.stdout.write("Dossier de presse inchangé.")
+        else:
+            self.stdout.write("Pas de page « À propos » publiée : rien à générer.")
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from home.media import cleanup_media
+
+
+class Command(BaseCommand):
+    help = (
+        "Supprime les renditions et fichiers d'images inutilisés et fusionne les fichiers "
+        "identiques. Lancer `rebuild_references_index` avant la première utilisation."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Affiche ce qui serait fait sans rien modifier.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        report = cleanup_media(dry_run=dry_run)
+
+        if options["verbosity"] > 1:
+            for name in report.orphan_files:
+                self.stdout.write(f"  fichier orphelin : {name}")
+            for name, target in report.merged_files:
+                self.stdout.write(f"  {name} -> {target}")
+
+        self.stdout.write(f"Renditions obsolètes : {report.stale_renditions}")
+        self.stdout.write(f"Fichiers orphelins : {len(report.orphan_files)}")
+        self.stdout.write(f"Fichiers identiques fusionnés : {len(report.merged_files)}")
+        verb = "récupérables" if dry_run else "récupérés"
+        self.stdout.write(self.style.SUCCESS(f"Espace {verb} : {filesizeformat(report.reclaimed_bytes)}"))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from home.export import StaticExport, get_export_dir
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporte les pages publiées (HTML pré-compressé), leurs images et documents dans "
+        "STATIC_EXPORT_DIR. À relancer chaque nuit pour les prochains spectacles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="Dossier de destination (par défaut : STATIC_EXPORT_DIR).",
+        )
+        parser.add_argument(
+            "--page",
+            type=int,
+            action="append",
+            dest="page_ids",
+            help="N'exporter que cette page (répétable).",
+        )
+
+    def handle(self, *args, **options):
+        output = options["output"] or get_export_dir()
+        if output is None:
+            raise CommandError("Indiquer --output ou définir STATIC_EXPORT_DIR.")
+
+        export = StaticExport(output)
+        if options["page_ids"]:
+            count = export.export_pages(options["page_ids"])
+        else:
+            count = export.export_site()
+        if options["verbosity"] > 1:
+            for page_id, name in sorted(export.pages.items()):
+                self.stdout.write(f"  page {page_id} -> {name}")
+        self.stdout.write(self.style.SUCCESS(f"{count} page(s) exportée(s) dans {output}."))
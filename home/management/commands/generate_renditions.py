@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from home.renditions import find_template_filter_specs, generate_all_renditions
+
+
+class Command(BaseCommand):
+    help = "Pré-génère toutes les renditions utilisées par les gabarits, pour toutes les images."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Nombre de processus (par défaut : nombre de cœurs).",
+        )
+        parser.add_argument(
+            "--spec",
+            action="append",
+            dest="specs",
+            help="Filtre à générer (répétable). Par défaut : filtres trouvés dans les gabarits.",
+        )
+
+    def handle(self, *args, **options):
+        specs = options["specs"] or find_template_filter_specs()
+        self.stdout.write(f"Filtres : {', '.join(specs)}")
+
+        count = 0
+        for image_id, _ in generate_all_renditions(specs, workers=options["workers"]):
+            count += 1
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  image {image_id} OK")
+
+        self.stdout.write(self.style.SUCCESS(f"{count} image(s) traitée(s)."))
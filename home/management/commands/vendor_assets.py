@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from home.assets import build_vendor_assets, get_vendor_root
+
+
+class Command(BaseCommand):
+    help = (
+        "Télécharge Font Awesome, slick, jQuery et les polices Google dans static/vendor/ "
+        "et les regroupe en bundle.css / bundle.js. Lancer ensuite collectstatic."
+    )
+
+    def handle(self, *args, **options):
+        written = build_vendor_assets()
+        if options["verbosity"] > 1:
+            for name in written:
+                self.stdout.write(f"  {name}")
+        self.stdout.write(self.style.SUCCESS(f"{len(written)} fichiers écrits dans {get_vendor_root()}"))
@@ -0,0 +1,173 @@
+"""
+Nettoyage du dossier media.
+
+- Les fichiers qui ne correspondent plus à aucune image ni rendition en base
+  (renditions de renditions, copies laissées par d'anciens envois...) sont
+  supprimés, s'ils ont plus de `MEDIA_ORPHAN_GRACE_PERIOD` secondes : une
+  rendition en cours de génération ou un envoi en cours écrit son fichier
+  avant que la ligne correspondante soit enregistrée.
+- Les renditions dont le filtre n'est plus utilisé par aucun gabarit, par le
+  code (`home.renditions.CODE_FILTER_SPECS`) ni par les formats d'images des
+  champs de texte riche, ou dont
+  l'image n'est plus référencée par aucune page / bloc StreamField, sont
+  supprimées (Wagtail les régénère si besoin).
+- Les fichiers identiques octet pour octet sont fusionnés en liens physiques :
+  les chemins en base restent valides, l'espace n'est occupé qu'une fois.
+"""
+
+import hashlib
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+
+from wagtail.images import get_image_model
+from wagtail.images.formats import get_image_formats
+from wagtail.models import ReferenceIndex
+
+from .renditions import CODE_FILTER_SPECS, find_template_filter_specs
+
+# Dossiers gérés par wagtail.images dans MEDIA_ROOT.
+IMAGE_DIRS = ("original_images", "images")
+
+# Renditions demandées en Python par l'admin Wagtail (vignettes, recadrage).
+ADMIN_FILTER_SPECS = {"max-165x165", "max-800x600", "original"}
+
+
+def get_orphan_grace_period():
+    return getattr(settings, "MEDIA_ORPHAN_GRACE_PERIOD", 60 * 60)
+
+
+@dataclass
+class CleanupReport:
+    orphan_files: list = field(default_factory=list)
+    stale_renditions: int = 0
+    merged_files: list = field(default_factory=list)
+    reclaimed_bytes: int = 0
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _media_files(media_root):
+    for folder in IMAGE_DIRS:
+        directory = media_root / folder
+        if directory.is_dir():
+            yield from (path for path in directory.rglob("*") if path.is_file())
+
+
+def get_used_filter_specs():
+    """Filtres des gabarits, de l'admin, du code et des images insérées dans le texte riche."""
+    rich_text_specs = {image_format.filter_spec for image_format in get_image_formats()}
+    return (
+        set(find_template_filter_specs(include_installed_apps=True))
+        | ADMIN_FILTER_SPECS
+        | CODE_FILTER_SPECS
+        | rich_text_specs
+    )
+
+
+def get_referenced_image_ids():
+    """Images utilisées par au moins une page, un snippet ou un réglage."""
+    content_type = ContentType.objects.get_for_model(get_image_model())
+    return {
+        int(pk)
+        for pk in ReferenceIndex.objects.filter(to_content_type=content_type)
+        .values_list("to_object_id", flat=True)
+        .distinct()
+    }
+
+
+def delete_stale_renditions(report, dry_run=False):
+    """
+    Supprime les renditions dont le filtre n'est plus utilisé, ou dont l'image
+    n'est plus référencée nulle part (hors vignettes de l'admin).
+    """
+    Rendition = get_image_model().get_rendition_model()
+    used_specs = get_used_filter_specs()
+    referenced_ids = get_referenced_image_ids()
+
+    stale = Rendition.objects.filter(
+        ~Q(filter_spec__in=used_specs)
+        | (~Q(image_id__in=referenced_ids) & ~Q(filter_spec__in=ADMIN_FILTER_SPECS))
+    )
+
+    for rendition in stale.iterator():
+        report.stale_renditions += 1
+        try:
+            report.reclaimed_bytes += rendition.file.size
+        except OSError:
+            pass
+        if not dry_run:
+            # Le fichier est supprimé par Wagtail à la suppression de la ligne.
+            rendition.delete()
+
+
+def delete_orphan_files(report, media_root, dry_run=False):
+    """Supprime les fichiers d'images qui ne sont plus rattachés à la base."""
+    Image = get_image_model()
+    Rendition = Image.get_rendition_model()
+    known = set(Image.objects.values_list("file", flat=True))
+    known |= set(Rendition.objects.values_list("file", flat=True))
+    # Fichiers récents : leur ligne en base n'est peut-être pas encore enregistrée.
+    written_before = time.time() - get_orphan_grace_period()
+
+    for path in _media_files(media_root):
+        name = path.relative_to(media_root).as_posix()
+        if name in known:
+            continue
+        stat = path.stat()
+        if stat.st_mtime > written_before:
+            continue
+        report.orphan_files.append(name)
+        report.reclaimed_bytes += stat.st_size
+        if not dry_run:
+            path.unlink()
+
+
+def merge_identical_files(report, media_root, dry_run=False):
+    """Remplace les copies identiques par des liens physiques vers un seul fichier."""
+    orphans = set(report.orphan_files)
+    by_size = defaultdict(list)
+    for path in _media_files(media_root):
+        if path.relative_to(media_root).as_posix() not in orphans:
+            by_size[path.stat().st_size].append(path)
+
+    for size, paths in by_size.items():
+        if len(paths) < 2:
+            continue
+        by_digest = defaultdict(list)
+        for path in paths:
+            by_digest[file_digest(path)].append(path)
+        for duplicates in by_digest.values():
+            keep, *others = sorted(duplicates)
+            for path in others:
+                if path.stat().st_ino == keep.stat().st_ino:
+                    continue  # déjà fusionné
+                report.merged_files.append(
+                    (path.relative_to(media_root).as_posix(), keep.relative_to(media_root).as_posix())
+                )
+                report.reclaimed_bytes += size
+                if not dry_run:
+                    temporary = path.with_name(path.name + ".merging")
+                    os.link(keep, temporary)
+                    os.replace(temporary, path)
+
+
+def cleanup_media(dry_run=False):
+    media_root = Path(settings.MEDIA_ROOT)
+    report = CleanupReport()
+    delete_stale_renditions(report, dry_run)
+    delete_orphan_files(report, media_root, dry_run)
+    merge_identical_files(report, media_root, dry_run)
+    return report
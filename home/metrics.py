@@ -0,0 +1,238 @@
+"""
+Mesures par requête : requêtes SQL (nombre et durée), rendu des gabarits,
+renditions d'images générées, succès / échecs des caches.
+
+`MetricsMiddleware` ouvre une mesure pour chaque requête et :
+
+- ajoute un en-tête `Server-Timing` (visible dans l'onglet Réseau du
+  navigateur) ;
+- cumule les mesures par type de page (`home.homepage`, `home.showspage`...,
+  ou nom de la vue pour le reste) ;
+- journalise les pages qui dépassent leur budget de requêtes SQL
+  (`PAGE_QUERY_BUDGETS`).
+
+Les cumuls sont exposés au format texte de Prometheus sur `/metrics`, avec
+le jeton `METRICS_TOKEN` (`Authorization: Bearer ...`, option
+`authorization` du scrape Prometheus) ou pour les adresses de
+`METRICS_ALLOWED_IPS`. Chaque worker gunicorn a ses propres
+compteurs (étiquette `worker`) : Prometheus additionne les séries.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import cache
+
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from wagtail.images import get_image_model
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar("request_metrics", default=None)
+
+
+@cache
+def get_rendition_table():
+    return f'"{get_image_model().get_rendition_model()._meta.db_table}"'
+
+
+@dataclass
+class RequestMetrics:
+    page_type: str = ""
+    queries: int = 0
+    query_time: float = 0.0
+    template_time: float = 0.0
+    renditions: int = 0
+    cache: dict = field(default_factory=lambda: defaultdict(lambda: [0, 0]))  # nom -> [succès, échecs]
+
+    def query_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_time += time.perf_counter() - start
+            # Wagtail crée les renditions une par une ou par `bulk_create`
+            # (sans signal post_save) : on compte les lignes insérées.
+            if sql.startswith("INSERT") and get_rendition_table() in sql.partition("VALUES")[0]:
+                self.renditions += sql.count("), (") + 1
+
+
+# ==========================================
+# 📍 ENREGISTREMENT (appelé par le reste du code)
+# ==========================================
+# Sans requête en cours (tâches, commandes), ces fonctions ne font rien.
+
+def record_cache(name, hit):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.cache[name][0 if hit else 1] += 1
+
+
+def set_page_type(label):
+    """Type de la requête en cours : modèle de page ("home.homepage"), "page_cache"..."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.page_type = label
+
+
+def get_query_budget(page_type):
+    return getattr(settings, "PAGE_QUERY_BUDGETS", {}).get(page_type)
+
+
+# ==========================================
+# 📊 CUMULS PAR TYPE DE PAGE
+# ==========================================
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = defaultdict(int)
+        self.duration = defaultdict(float)
+        self.queries = defaultdict(int)
+        self.query_time = defaultdict(float)
+        self.template_time = defaultdict(float)
+        self.renditions = defaultdict(int)
+        self.over_budget = defaultdict(int)
+        self.cache = defaultdict(int)  # (type de page, cache, résultat) -> nombre
+
+    def add(self, metrics, duration):
+        page_type = metrics.page_type
+        with self.lock:
+            self.requests[page_type] += 1
+            self.duration[page_type] += duration
+            self.queries[page_type] += metrics.queries
+            self.query_time[page_type] += metrics.query_time
+            self.template_time[page_type] += metrics.template_time
+            self.renditions[page_type] += metrics.renditions
+            for name, (hits, misses) in metrics.cache.items():
+                self.cache[page_type, name, "hit"] += hits
+                self.cache[page_type, name, "miss"] += misses
+
+    def render(self):
+        """Cumuls au format texte de Prometheus."""
+        worker = os.getpid()
+        with self.lock:
+            per_type = [
+                ("wassim_requests_total", "counter", "Requêtes traitées.", self.requests),
+                ("wassim_request_duration_seconds_total", "counter", "Temps de traitement cumulé.", self.duration),
+                ("wassim_db_queries_total", "counter", "Requêtes SQL exécutées.", self.queries),
+                ("wassim_db_query_seconds_total", "counter", "Temps cumulé des requêtes SQL.", self.query_time),
+                ("wassim_template_render_seconds_total", "counter", "Temps cumulé de rendu des gabarits.", self.template_time),
+                ("wassim_renditions_generated_total", "counter", "Renditions d'images générées pendant une requête.", self.renditions),
+                ("wassim_query_budget_exceeded_total", "counter", "Pages au-delà de leur budget de requêtes SQL.", self.over_budget),
+            ]
+            lines = []
+            for name, kind, help_text, values in per_type:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+                for page_type, value in sorted(values.items()):
+                    lines.append(f'{name}{{page_type="{page_type}",worker="{worker}"}} {value:g}')
+            lines += [
+                "# HELP wassim_cache_requests_total Lectures des caches (page, modèles, API, recherche).",
+                "# TYPE wassim_cache_requests_total counter",
+            ]
+            for (page_type, cache_name, result), value in sorted(self.cache.items()):
+                lines.append(
+                    f'wassim_cache_requests_total{{page_type="{page_type}",cache="{cache_name}",'
+                    f'result="{result}",worker="{worker}"}} {value}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+# ==========================================
+# 🧭 MIDDLEWARE ET VUE
+# ==========================================
+
+def server_timing(metrics, duration):
+    entries = [
+        # Valeurs ASCII : les en-têtes HTTP n'acceptent pas les accents.
+        f'db;dur={metrics.query_time * 1000:.1f};desc="{metrics.queries} SQL"',
+        f"tpl;dur={metrics.template_time * 1000:.1f}",
+    ]
+    if metrics.renditions:
+        entries.append(f'img;desc="{metrics.renditions} renditions"')
+    for name, (hits, misses) in sorted(metrics.cache.items()):
+        entries.append(f'cache-{name};desc="{hits} hit / {misses} miss"')
+    entries.append(f"total;dur={duration * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class MetricsMiddleware:
+    """
+    À placer en tête de `MIDDLEWARE` (juste après `SecurityMiddleware`) pour
+    mesurer aussi les pages servies par `PageCacheMiddleware`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics.query_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        duration = time.perf_counter() - start
+
+        if not metrics.page_type:
+            match = getattr(request, "resolver_match", None)
+            metrics.page_type = match.view_name if match and match.view_name else "other"
+        registry.add(metrics, duration)
+
+        budget = get_query_budget(metrics.page_type)
+        if budget is not None and metrics.queries > budget:
+            with registry.lock:
+                registry.over_budget[metrics.page_type] += 1
+            logger.warning(
+                "%s %s : %d requêtes SQL (budget %d)", metrics.page_type, request.path, metrics.queries, budget
+            )
+
+        response["Server-Timing"] = server_timing(metrics, duration)
+        return response
+
+    def process_template_response(self, request, response):
+        # Appelé juste avant le rendu du gabarit, terminé dans le rappel.
+        metrics = _current.get()
+        if metrics is not None:
+            start = time.perf_counter()
+
+            def done(rendered):
+                metrics.template_time += time.perf_counter() - start
+
+            response.add_post_render_callback(done)
+        return response
+
+
+def is_metrics_request_allowed(request):
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token and constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return True
+    # Liste vide par défaut : derrière un proxy local, REMOTE_ADDR vaut toujours 127.0.0.1.
+    return request.META.get("REMOTE_ADDR") in getattr(settings, "METRICS_ALLOWED_IPS", ())
+
+
+def metrics_view(request):
+    """Cumuls au format Prometheus, avec METRICS_TOKEN ou depuis METRICS_ALLOWED_IPS."""
+    if not is_metrics_request_allowed(request):
+        raise Http404
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
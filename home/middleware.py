@@ -0,0 +1,29 @@
+from .cache import get_cached_response, store_response
+from .metrics import set_page_type
+
+
+class PageCacheMiddleware:
+    """
+    Sert les pages Wagtail depuis le cache avant même la résolution de l'URL,
+    et met en cache les réponses des pages qui utilisent `PageCacheMixin`.
+
+    Doit être placé après `AuthenticationMiddleware` (la clé dépend de l'état
+    connecté du visiteur).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = get_cached_response(request)
+        if response is not None:
+            set_page_type("page_cache")
+            return response
+
+        response = self.get_response(request)
+
+        if hasattr(response, "render") and not response.is_rendered:
+            response.add_post_render_callback(lambda r: store_response(request, r))
+        else:
+            store_response(request, response)
+        return response
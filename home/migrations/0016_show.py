@@ -0,0 +1,70 @@
+# Generated by Django 5.2.8 on 2026-10-18 09:12
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_shows(apps, schema_editor):
+    # Remplit la table Show à partir des StreamFields existants (données brutes JSON)
+    ShowsPage = apps.get_model("home.ShowsPage")
+    Show = apps.get_model("home.Show")
+    Image = apps.get_model("wagtailimages.Image")
+    image_ids = set(Image.objects.values_list("pk", flat=True))
+
+    for page in ShowsPage.objects.all():
+        entries = []
+        for position, block in enumerate(page.shows.raw_data):
+            value = block.get("value") or {}
+            if not value.get("date"):
+                continue
+            entries.append(Show(
+                page=page,
+                block_id=block.get("id") or "",
+                sort_order=position,
+                title=value.get("title") or "",
+                date=datetime.date.fromisoformat(value["date"]),
+                time=datetime.time.fromisoformat(value["time"]) if value.get("time") else None,
+                venue=value.get("venue") or "",
+                city=value.get("city") or "",
+                description=value.get("description") or "",
+                poster_id=value.get("poster") if value.get("poster") in image_ids else None,
+                ticket_link=value.get("ticket_link") or "",
+            ))
+        Show.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0015_sitesettings'),
+        ('wagtailimages', '0027_image_description'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Show',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('block_id', models.CharField(blank=True, max_length=64)),
+                ('sort_order', models.PositiveIntegerField(default=0)),
+                ('title', models.CharField(max_length=255)),
+                ('date', models.DateField()),
+                ('time', models.TimeField(blank=True, null=True)),
+                ('venue', models.CharField(blank=True, max_length=255)),
+                ('city', models.CharField(blank=True, max_length=100)),
+                ('description', models.TextField(blank=True)),
+                ('ticket_link', models.URLField(blank=True)),
+                ('page', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='show_entries', to='home.showspage')),
+                ('poster', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='wagtailimages.image')),
+            ],
+            options={
+                'verbose_name': 'Date de spectacle',
+                'verbose_name_plural': 'Dates de spectacles',
+                'ordering': ['date', 'time'],
+                'indexes': [models.Index(fields=['date', 'city'], name='home_show_date_0fc962_idx')],
+            },
+        ),
+        migrations.RunPython(populate_shows, migrations.RunPython.noop),
+    ]
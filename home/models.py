@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from modelcluster.fields import ParentalKey
 from datetime import date
 
@@ -7,11 +7,14 @@ from wagtail.fields import RichTextField, StreamField
 from wagtail.admin.panels import FieldPanel, MultiFieldPanel, InlinePanel
 from wagtail import blocks
 from wagtail.images.blocks import ImageChooserBlock
-from wagtail.contrib.forms.models import AbstractEmailForm, AbstractFormField
+from wagtail.search import index
+from wagtail.contrib.forms.models import AbstractEmailForm, AbstractFormField, FormMixin
 from wagtail.contrib.forms.panels import FormSubmissionsPanel
 from wagtail.contrib.settings.models import BaseGenericSetting, register_setting
 from wagtail.snippets.models import register_snippet
 
+from .cache import CachedGenericSettingMixin, PageCacheMixin, get_cached_queryset
+
 # ==========================================
 # 📦 BLOCS RÉUTILISABLES
 # ==========================================
@@ -71,7 +74,7 @@ class Testimonial(models.Model):
 # 🏠 PAGES DU SITE
 # ==========================================
 
-class HomePage(Page):
+class HomePage(PageCacheMixin, Page):
     hero_title = models.CharField(max_length=255, default="Wassim El Fath")
     hero_subtitle = models.CharField(max_length=255, default="Comédien Stand-Up")
     hero_description = RichTextField(blank=True)
@@ -93,6 +96,12 @@ class HomePage(Page):
         verbose_name="Lien vers la page Spectacles"
     )
 
+    search_fields = Page.search_fields + [
+        index.SearchField('hero_title'),
+        index.SearchField('hero_subtitle'),
+        index.SearchField('hero_description'),
+    ]
+
     content_panels = Page.content_panels + [
         MultiFieldPanel([
             FieldPanel('hero_title'),
@@ -110,30 +119,130 @@ class HomePage(Page):
     # AJOUT : Cette fonction permet d'afficher les témoignages sur la Home
     def get_context(self, request):
         context = super().get_context(request)
-        context['testimonials'] = Testimonial.objects.all()
+        # Lue depuis le cache partagé, invalidé à chaque modification d'un témoignage
+        context['testimonials'] = get_cached_queryset(Testimonial.objects.all())
+        # Requête indexée sur (date, ville) avec LIMIT, au lieu de parcourir le StreamField
+        context['upcoming_shows'] = Show.objects.live().upcoming().select_related('poster')[:3]
         return context
 
     max_count = 1
     subpage_types = ['ShowsPage', 'GalleryPage', 'PressPage', 'AboutPage', 'ContactPage']
 
 
-class ShowsPage(Page):
+class ShowsPage(PageCacheMixin, Page):
     intro = RichTextField(blank=True)
     shows = StreamField([('show', ShowBlock())], blank=True, use_json_field=True)
 
+    search_fields = Page.search_fields + [
+        index.SearchField('intro'),
+        index.SearchField('shows'),
+    ]
+
     content_panels = Page.content_panels + [
         FieldPanel('intro'),
         FieldPanel('shows'),
     ]
 
-    def get_upcoming_shows(self):
-        today = date.today()
-        upcoming = [s for s in self.shows if s.value.get('date') and s.value.get('date') >= today]
-        upcoming.sort(key=lambda x: x.value.get('date'))
-        return upcoming
+    def save(self, *args, **kwargs):
+        result = super().save(*args, **kwargs)
+        # Les brouillons ne mettent à jour que quelques colonnes (révision,
+        # draft_title...) : on ne resynchronise que si `shows` a pu changer.
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'shows' in update_fields:
+            self.sync_shows()
+        return result
+
+    def sync_shows(self):
+        """
+        Recopie les spectacles du StreamField dans la table `Show`, indexée,
+        pour ne plus avoir à désérialiser tout le StreamField à chaque page vue.
+        """
+        entries = []
+        for position, block in enumerate(self.shows):
+            value = block.value
+            if not value.get('date'):
+                continue
+            poster = value.get('poster')
+            entries.append(Show(
+                page=self,
+                block_id=block.id or '',
+                sort_order=position,
+                title=value.get('title') or '',
+                date=value.get('date'),
+                time=value.get('time'),
+                venue=value.get('venue') or '',
+                city=value.get('city') or '',
+                description=value.get('description') or '',
+                poster_id=poster.pk if poster else None,
+                ticket_link=value.get('ticket_link') or '',
+            ))
+        with transaction.atomic():
+            Show.objects.filter(page=self).delete()
+            Show.objects.bulk_create(entries)
+
+    def get_upcoming_shows(self, limit=None):
+        shows = self.show_entries.upcoming().select_related('poster')
+        return shows[:limit] if limit else shows
+
+    def get_context(self, request, *args, **kwargs):
+        context = super().get_context(request, *args, **kwargs)
+        if getattr(request, 'is_preview', False):
+            # En prévisualisation, le brouillon n'est pas encore dans la table `Show`.
+            today = date.today()
+            upcoming = [s.value for s in self.shows if s.value.get('date') and s.value.get('date') >= today]
+            upcoming.sort(key=lambda value: value.get('date'))
+            context['upcoming_shows'] = upcoming
+        else:
+            context['upcoming_shows'] = self.get_upcoming_shows()
+        return context
+
+
+class ShowQuerySet(models.QuerySet):
+    def upcoming(self):
+        return self.filter(date__gte=date.today()).order_by('date', 'time')
+
+    def live(self):
+        return self.filter(page__live=True)
+
+
+class Show(models.Model):
+    """
+    Copie dénormalisée des blocs `ShowBlock` d'une `ShowsPage`, mise à jour à
+    chaque enregistrement / publication de la page.
+    """
+    page = models.ForeignKey(ShowsPage, on_delete=models.CASCADE, related_name='show_entries')
+    block_id = models.CharField(max_length=64, blank=True)
+    sort_order = models.PositiveIntegerField(default=0)
+    title = models.CharField(max_length=255)
+    date = models.DateField()
+    time = models.TimeField(null=True, blank=True)
+    venue = models.CharField(max_length=255, blank=True)
+    city = models.CharField(max_length=100, blank=True)
+    description = models.TextField(blank=True)
+    poster = models.ForeignKey(
+        'wagtailimages.Image',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+'
+    )
+    ticket_link = models.URLField(blank=True)
+
+    objects = ShowQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.title} - {self.city} ({self.date:%d/%m/%Y})"
+
+    class Meta:
+        ordering = ['date', 'time']
+        indexes = [
+            models.Index(fields=['date', 'city']),
+        ]
+        verbose_name = "Date de spectacle"
+        verbose_name_plural = "Dates de spectacles"
 
 
-class GalleryPage(Page):
+class GalleryPage(PageCacheMixin, Page):
     intro = RichTextField(blank=True)
     gallery_images = StreamField([
         ('photo_cliche', blocks.StructBlock([
@@ -142,23 +251,33 @@ class GalleryPage(Page):
         ], label="Cliché avec légende"))
     ], blank=True, use_json_field=True)
 
+    search_fields = Page.search_fields + [
+        index.SearchField('intro'),
+        index.SearchField('gallery_images'),
+    ]
+
     content_panels = Page.content_panels + [
         FieldPanel('intro'),
         FieldPanel('gallery_images'),
     ]
 
 
-class PressPage(Page):
+class PressPage(PageCacheMixin, Page):
     intro = RichTextField(blank=True)
     press_articles = StreamField([('article', PressArticleBlock())], blank=True, use_json_field=True)
 
+    search_fields = Page.search_fields + [
+        index.SearchField('intro'),
+        index.SearchField('press_articles'),
+    ]
+
     content_panels = Page.content_panels + [
         FieldPanel('intro'),
         FieldPanel('press_articles'),
     ]
 
 
-class AboutPage(Page):
+class AboutPage(PageCacheMixin, Page):
     body = RichTextField()
     portrait_image = models.ForeignKey(
         'wagtailimages.Image', 
@@ -176,12 +295,24 @@ class AboutPage(Page):
         related_name='+'
     ) # Et celle-ci aussi
 
+    search_fields = Page.search_fields + [
+        index.SearchField('body'),
+    ]
+
     content_panels = Page.content_panels + [
         FieldPanel('portrait_image'),
         FieldPanel('body'),
         FieldPanel('funny_pdf'),
     ]
 
+    def get_context(self, request, *args, **kwargs):
+        from .press_kit import get_press_kit
+
+        context = super().get_context(request, *args, **kwargs)
+        # PDF généré en tâche de fond ; le document envoyé à la main reste en secours.
+        context['press_kit'] = get_press_kit() or self.funny_pdf
+        return context
+
 # ==========================================
 # 📧 CONTACT
 # ==========================================
@@ -202,6 +333,10 @@ class ContactPage(AbstractEmailForm):
     intro = RichTextField(blank=True)
     thank_you_text = RichTextField(blank=True)
 
+    search_fields = AbstractEmailForm.search_fields + [
+        index.SearchField('intro'),
+    ]
+
     content_panels = AbstractEmailForm.content_panels + [
         FormSubmissionsPanel(),
         FieldPanel('contact_image'),
@@ -214,12 +349,28 @@ class ContactPage(AbstractEmailForm):
             FieldPanel('subject'),
         ], heading="Configuration Email"),
     ]
+
+    def process_form_submission(self, form):
+        # On enregistre la soumission tout de suite, mais l'email part en tâche
+        # de fond : une connexion SMTP lente ne bloque plus le worker web.
+        submission = FormMixin.process_form_submission(self, form)
+        if self.to_address:
+            from .tasks import send_contact_email
+
+            send_contact_email.enqueue(
+                self.subject,
+                self.render_email(form),
+                [address.strip() for address in self.to_address.split(',')],
+                self.from_address,
+                submission_id=submission.pk,
+            )
+        return submission
 # ==========================================
 # ⚙️ RÉGLAGES GLOBAUX (Réseaux Sociaux)
 # ==========================================
 
 @register_setting
-class SiteSettings(BaseGenericSetting):
+class SiteSettings(CachedGenericSettingMixin, BaseGenericSetting):
     instagram_url = models.URLField(verbose_name="Instagram (URL)", blank=True, null=True)
     tiktok_url = models.URLField(verbose_name="TikTok (URL)", blank=True, null=True)
     youtube_url = models.URLField(verbose_name="YouTube (URL)", blank=True, null=True)
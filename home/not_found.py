@@ -0,0 +1,141 @@
+"""
+Réponses 404 rapides.
+
+Les scanners de vulnérabilités demandent des centaines d'URLs inexistantes
+(`/wp-login.php`, `/.env`...). Chacune coûtait une descente dans l'arbre des
+pages de Wagtail puis le rendu complet de `404.html` (base.html, réglages).
+
+- `NotFoundMiddleware` retient, dans chaque worker, les chemins qui ont
+  donné une 404 (LRU de `NOT_FOUND_CACHE_SIZE` entrées, chacune valable
+  `NOT_FOUND_CACHE_TIMEOUT` secondes). La requête suivante sur le même
+  chemin reçoit la 404 directement, sans résolution ni requête SQL.
+- `page_not_found` (le `handler404` du site) renvoie pour les visiteurs
+  anonymes un corps de page rendu une seule fois par nom d'hôte (chaque site
+  a ses liens et ses réglages).
+
+Seules les 404 du routage (aucune URL reconnue) ou des pages Wagtail sont
+retenues. Tout est oublié quand la version `not_found` (publication,
+dépublication, déplacement ou suppression d'une page, sites) ou la version
+`site` (réglages affichés dans base.html) change.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponseNotFound
+from django.template.loader import render_to_string
+from django.views import defaults
+
+from .cache import bump_version, get_versions
+from .metrics import record_cache, set_page_type
+
+NOT_FOUND_VERSION = "not_found"
+NOT_FOUND_TEMPLATE = "404.html"
+# Les noms d'hôte sont filtrés par ALLOWED_HOSTS ; la limite protège un
+# ALLOWED_HOSTS = ["*"] (développement).
+MAX_BODIES = 32
+
+
+def get_cache_size():
+    return getattr(settings, "NOT_FOUND_CACHE_SIZE", 1024)
+
+
+def get_cache_timeout():
+    return getattr(settings, "NOT_FOUND_CACHE_TIMEOUT", 5 * 60)
+
+
+def purge_not_found():
+    """Oublie les chemins inconnus de chaque worker ; encore une fois après le commit."""
+    bump_version(NOT_FOUND_VERSION)
+    transaction.on_commit(lambda: bump_version(NOT_FOUND_VERSION))
+
+
+class NotFoundCache:
+    def __init__(self):
+        self.entries = OrderedDict()  # (hôte, chemin) -> expiration (time.monotonic)
+        self.bodies = {}  # hôte -> corps de la page 404
+        self.version = None
+        self.lock = threading.Lock()
+
+    def ensure_current(self):
+        version, site_version = get_versions(NOT_FOUND_VERSION, "site")
+        if (version, site_version) == self.version:
+            return
+        with self.lock:
+            self.entries.clear()
+            self.bodies = {}
+            self.version = (version, site_version)
+
+    def is_missing(self, key):
+        with self.lock:
+            expires = self.entries.get(key)
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self.entries[key]
+                return False
+            self.entries.move_to_end(key)
+            return True
+
+    def add(self, key):
+        with self.lock:
+            self.entries[key] = time.monotonic() + get_cache_timeout()
+            self.entries.move_to_end(key)
+            while len(self.entries) > get_cache_size():
+                self.entries.popitem(last=False)
+
+    def get_body(self, request):
+        host = request.get_host()
+        body = self.bodies.get(host)
+        if body is None:
+            body = render_to_string(NOT_FOUND_TEMPLATE, {"request_path": request.path}, request=request)
+            with self.lock:
+                if len(self.bodies) >= MAX_BODIES:
+                    self.bodies.clear()
+                self.bodies[host] = body
+        return body
+
+
+not_found_cache = NotFoundCache()
+
+
+def page_not_found(request, exception=None):
+    """`handler404` : corps déjà rendu pour les anonymes, rendu complet pour les éditeurs (barre Wagtail)."""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return defaults.page_not_found(request, exception)
+    not_found_cache.ensure_current()
+    return HttpResponseNotFound(not_found_cache.get_body(request))
+
+
+class NotFoundMiddleware:
+    """
+    À placer après `RedirectMiddleware` (une redirection créée pour un
+    chemin inconnu s'applique tout de suite) et avant `PageCacheMiddleware`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        key = None
+        if request.method in ("GET", "HEAD") and get_cache_timeout() and get_cache_size():
+            not_found_cache.ensure_current()
+            key = (request.get_host(), request.get_full_path())
+            if not_found_cache.is_missing(key):
+                record_cache("not_found", hit=True)
+                set_page_type("not_found")
+                return page_not_found(request)
+
+        response = self.get_response(request)
+
+        if key is not None and response.status_code == 404:
+            match = request.resolver_match
+            # Les autres vues (documents, API) ont leurs propres 404, non invalidées ici.
+            if match is None or match.url_name == "wagtail_serve":
+                record_cache("not_found", hit=False)
+                not_found_cache.add(key)
+        return response
@@ -0,0 +1,138 @@
+"""
+Dossier de presse PDF généré automatiquement.
+
+Le PDF reprend la bio et le portrait de la page "À propos", les prochains
+spectacles et les citations de la revue de presse. WeasyPrint met plusieurs
+secondes et des centaines de Mo à le produire : il n'est jamais rendu
+pendant une requête web, seulement par la tâche `generate_press_kit`,
+lancée à chaque publication d'une de ces pages (et chaque nuit par
+`manage.py build_press_kit`, pour retirer les spectacles passés).
+
+Le nom du fichier contient l'empreinte du HTML source (et du fichier du
+portrait) : si rien n'a changé, le PDF existant est gardé tel quel, sans
+nouveau rendu. Il est enregistré comme un document Wagtail, servi depuis le
+disque comme les autres.
+"""
+
+import hashlib
+import mimetypes
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.template.loader import render_to_string
+
+from wagtail.documents import get_document_model
+
+from .cache import purge_page
+from .models import AboutPage, PressPage, Show
+from .renditions import register_filter_spec
+
+PRESS_KIT_TITLE = "Dossier de presse (généré automatiquement)"
+PRESS_KIT_TEMPLATE = "home/press_kit.html"
+PORTRAIT_FILTER = register_filter_spec("width-600|format-jpeg")
+MAX_SHOWS = 12
+
+
+def get_press_kit():
+    """Document du dernier dossier de presse généré, ou None."""
+    return get_document_model().objects.filter(title=PRESS_KIT_TITLE).first()
+
+
+def get_about_page():
+    return AboutPage.objects.live().public().select_related("portrait_image").first()
+
+
+def get_press_quotes():
+    quotes = []
+    for page in PressPage.objects.live().public():
+        for block in page.press_articles:
+            if block.value["excerpt"]:
+                quotes.append(block.value)
+    # Les plus récentes d'abord, les citations sans date à la fin.
+    quotes.sort(key=lambda quote: -quote["publication_date"].toordinal() if quote["publication_date"] else 0)
+    return quotes
+
+
+def render_press_kit_html(about):
+    portrait = about.portrait_image.get_rendition(PORTRAIT_FILTER) if about.portrait_image else None
+    return render_to_string(PRESS_KIT_TEMPLATE, {
+        "about": about,
+        "portrait": portrait,
+        "shows": Show.objects.live().upcoming().select_related("page")[:MAX_SHOWS],
+        "quotes": get_press_quotes(),
+    })
+
+
+def get_digest(about, html):
+    digest = hashlib.sha256(html.encode())
+    # Une image remplacée garde parfois l'URL de sa rendition : on ajoute son contenu.
+    if about.portrait_image:
+        digest.update(about.portrait_image.get_file_hash().encode())
+    return digest.hexdigest()[:16]
+
+
+# ==========================================
+# 🖨️ RENDU WEASYPRINT
+# ==========================================
+
+def fetch_media(url):
+    """
+    Les images du PDF sont lues dans le stockage des médias : pas de requête
+    HTTP depuis le worker, et rien d'autre n'est chargé.
+    """
+    path = urlsplit(url).path
+    if not path.startswith(settings.MEDIA_URL):
+        raise ValueError(f"URL non autorisée dans le dossier de presse : {url}")
+    name = unquote(path.removeprefix(settings.MEDIA_URL))
+    with default_storage.open(name) as f:
+        return {"string": f.read(), "mime_type": mimetypes.guess_type(name)[0], "redirected_url": url}
+
+
+def render_pdf(html, base_url):
+    # Importé ici : WeasyPrint charge Pango au démarrage, seul le worker de tâches en a besoin.
+    from weasyprint import HTML
+
+    return HTML(string=html, base_url=base_url, url_fetcher=fetch_media).write_pdf()
+
+
+# ==========================================
+# 📄 GÉNÉRATION ET ENREGISTREMENT
+# ==========================================
+
+def build_press_kit():
+    """
+    Génère le dossier de presse si son contenu a changé. Renvoie le nouveau
+    document, ou None si rien n'a été rendu.
+    """
+    about = get_about_page()
+    if about is None:
+        return None
+    html = render_press_kit_html(about)
+    filename = f"dossier-de-presse-{get_digest(about, html)}.pdf"
+
+    document = get_press_kit()
+    if document is not None and document.filename == filename:
+        return None
+
+    pdf = render_pdf(html, base_url=about.full_url)
+    if document is None:
+        document = get_document_model()(title=PRESS_KIT_TITLE)
+    previous = document.file.name if document.file else None
+
+    storage = document.file.storage
+    name = document.file.field.generate_filename(document, filename)
+    if storage.exists(name):
+        # Fichier orphelin d'un essai précédent : sinon le stockage renommerait le nouveau.
+        storage.delete(name)
+    document.file.save(filename, ContentFile(pdf), save=False)
+    document._set_document_file_metadata()
+    document.save()
+    if previous and previous != document.file.name:
+        storage.delete(previous)
+
+    # Le lien de la page "À propos" pointe vers l'ancien nom de fichier.
+    for page in AboutPage.objects.live():
+        purge_page(page)
+    return document
@@ -0,0 +1,119 @@
+"""
+Redirections (`wagtail.contrib.redirects`) résolues en mémoire.
+
+Le middleware de Wagtail interroge la table des redirections à chaque 404 :
+les robots qui testent des URLs au hasard ajoutent autant de requêtes SQL.
+Ici, chaque worker garde toutes les redirections dans un dictionnaire
+indexé par chemin normalisé (comme `Redirect.normalise_path`), avec leur
+lien de destination déjà calculé. Une 404 sans redirection ne coûte qu'une
+lecture de version dans le cache, sans requête SQL.
+
+L'index est chargé au démarrage du worker et reconstruit quand la version
+`redirects` (voir `home.cache`) change : modification d'une redirection ou
+d'un site, déplacement ou changement de slug d'une page (les liens vers les
+pages changent, Wagtail crée de nouvelles redirections).
+"""
+
+import logging
+import threading
+from urllib.parse import urlparse
+
+from django import http
+from django.db import DatabaseError, transaction
+from django.utils.encoding import uri_to_iri
+
+from wagtail.contrib.redirects.models import Redirect
+from wagtail.models import Site
+
+from .cache import bump_version, get_version
+
+logger = logging.getLogger(__name__)
+
+REDIRECTS_VERSION = "redirects"
+
+
+def purge_redirects():
+    """Reconstruit l'index de chaque worker ; encore une fois après le commit."""
+    bump_version(REDIRECTS_VERSION)
+    transaction.on_commit(lambda: bump_version(REDIRECTS_VERSION))
+
+
+class RedirectIndex:
+    def __init__(self):
+        # (chemin normalisé -> {id du site ou None: (lien, permanente)},
+        #  chemins sans requête qui ont au moins une redirection avec requête)
+        self.entries = ({}, frozenset())
+        self.version = None
+        self.lock = threading.Lock()
+
+    def build(self, redirects, version=None):
+        paths = {}
+        for redirect in redirects:
+            link = redirect.link
+            if link is not None:
+                paths.setdefault(redirect.old_path, {})[redirect.site_id] = (link, redirect.is_permanent)
+        # Un seul attribut remplacé, comme l'index d'autocomplétion.
+        self.entries = (paths, frozenset(urlparse(path).path for path in paths if "?" in path))
+        self.version = version
+
+    def ensure_current(self):
+        version = get_version(REDIRECTS_VERSION)
+        if version == self.version:
+            return
+        with self.lock:
+            if version != self.version:
+                self.build(Redirect.objects.select_related("redirect_page"), version)
+
+    def _match(self, request, paths, path):
+        if "\0" in path:
+            return None
+        targets = paths.get(path) or paths.get(uri_to_iri(path))
+        if not targets:
+            return None
+        if set(targets) == {None}:
+            return targets[None]
+        # Redirection propre à un site : elle passe avant celle de tous les sites.
+        site = Site.find_for_request(request)
+        return targets.get(site.pk if site else None) or targets.get(None)
+
+    def find(self, request):
+        """(lien, permanente) de la redirection de cette requête, ou None."""
+        paths, paths_with_query = self.entries
+        path = Redirect.normalise_path(request.get_full_path())
+        path_without_query = urlparse(path).path
+        if path != path_without_query and not paths_with_query.isdisjoint(
+            (path_without_query, uri_to_iri(path_without_query))
+        ):
+            target = self._match(request, paths, path)
+            if target is not None:
+                return target
+        return self._match(request, paths, path_without_query)
+
+
+redirect_index = RedirectIndex()
+
+
+class RedirectMiddleware:
+    """Remplace `wagtail.contrib.redirects.middleware.RedirectMiddleware`."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        try:
+            redirect_index.ensure_current()
+        except DatabaseError:
+            # Base pas encore migrée : l'index sera chargé à la première 404.
+            logger.warning("Index des redirections non chargé au démarrage", exc_info=True)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.status_code != 404:
+            return response
+
+        redirect_index.ensure_current()
+        target = redirect_index.find(request)
+        if target is None:
+            return response
+        link, is_permanent = target
+        if is_permanent:
+            return http.HttpResponsePermanentRedirect(link)
+        return http.HttpResponseRedirect(link)
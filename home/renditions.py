@@ -0,0 +1,117 @@
+"""
+Pré-génération des renditions d'images.
+
+Les filtres (`fill-300x400`, `width-800`...) sont lus directement dans les
+gabarits du projet : on compile chaque gabarit et on récupère les nœuds des
+balises `{% image %}`, `{% srcset_image %}` et `{% picture %}`. Ajouter un
+nouveau format dans un gabarit suffit donc pour qu'il soit pré-généré.
+
+Les filtres demandés en Python (API, dossier de presse) sont déclarés avec
+`register_filter_spec`, pour que `home.media` ne supprime pas leurs
+renditions.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.db import connections
+from django.template import TemplateSyntaxError, engines
+from django.template.utils import get_app_template_dirs
+
+from wagtail.images import get_image_model
+from wagtail.images.models import Filter
+from wagtail.images.templatetags.wagtailimages_tags import ImageNode, SrcsetImageNode
+
+
+# Filtres utilisés hors des gabarits, remplis par `register_filter_spec` à
+# l'import des modules concernés (chargés par les `ready()` des applications).
+CODE_FILTER_SPECS = set()
+
+
+def register_filter_spec(spec):
+    """Déclare un filtre demandé par du code Python. Renvoie le filtre."""
+    CODE_FILTER_SPECS.add(spec)
+    return spec
+
+
+def get_template_dirs(include_installed_apps=False):
+    """
+    Dossiers de gabarits du projet. Avec `include_installed_apps`, ajoute
+    ceux des applications installées (admin Wagtail...).
+    """
+    base_dir = Path(settings.BASE_DIR).resolve()
+    dirs = []
+    for config in settings.TEMPLATES:
+        dirs.extend(Path(d) for d in config.get("DIRS", []))
+    dirs.extend(Path(d) for d in get_app_template_dirs("templates"))
+    if not include_installed_apps:
+        dirs = [d for d in dirs if d.resolve().is_relative_to(base_dir)]
+    return [d for d in dirs if d.is_dir()]
+
+
+def get_node_filter_specs(node):
+    if isinstance(node, SrcsetImageNode):
+        return Filter.expand_spec(node.filter_specs)
+    return ["|".join(node.filter_specs)]
+
+
+def find_template_filter_specs(include_installed_apps=False):
+    """Renvoie l'ensemble des filtres utilisés par les gabarits."""
+    engine = engines["django"].engine
+    specs = set()
+    for template_dir in get_template_dirs(include_installed_apps):
+        for path in template_dir.rglob("*.html"):
+            name = path.relative_to(template_dir).as_posix()
+            try:
+                template = engine.get_template(name)
+            except TemplateSyntaxError:
+                # Gabarits d'applications tierces qui dépendent d'apps non installées.
+                if not include_installed_apps:
+                    raise
+                continue
+            for node in template.nodelist.get_nodes_by_type(ImageNode):
+                specs.update(get_node_filter_specs(node))
+    return sorted(specs)
+
+
+def generate_renditions(image, specs=None):
+    """
+    Crée les renditions manquantes d'une image. Renvoie le nombre de filtres
+    traités.
+    """
+    specs = specs if specs is not None else find_template_filter_specs()
+    if specs:
+        image.get_renditions(*specs)
+    return len(specs)
+
+
+def _init_worker():
+    # Nécessaire quand les processus sont lancés en "spawn" (macOS, Windows).
+    django.setup()
+
+
+def _generate_for_image_id(image_id, specs):
+    image = get_image_model().objects.filter(pk=image_id).first()
+    if image is None:
+        return image_id, 0
+    return image_id, generate_renditions(image, specs)
+
+
+def generate_all_renditions(specs=None, images=None, workers=None):
+    """
+    Génère les renditions de toutes les images dans un pool de processus
+    (le redimensionnement Pillow est limité par le CPU, pas par les E/S).
+    Renvoie un itérateur de tuples (image_id, nombre de filtres).
+    """
+    specs = specs if specs is not None else find_template_filter_specs()
+    images = images if images is not None else get_image_model().objects.all()
+    image_ids = list(images.values_list("pk", flat=True))
+
+    # Les connexions ouvertes ne doivent pas être partagées avec les enfants.
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(_generate_for_image_id, pk, specs) for pk in image_ids]
+        for future in as_completed(futures):
+            yield future.result()
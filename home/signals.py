@@ -0,0 +1,120 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from wagtail.contrib.redirects.models import Redirect
+from wagtail.images import get_image_model
+from wagtail.models import Page, Site
+from wagtail.signals import page_published, page_slug_changed, page_unpublished, post_page_move
+
+from .cache import purge_model, purge_page, purge_site
+from .export import get_export_dir, page_and_ancestor_ids
+from .models import AboutPage, PressPage, ShowsPage, SiteSettings, Testimonial
+from .not_found import purge_not_found
+from .redirects import purge_redirects
+from .tasks import export_pages, export_site, generate_image_renditions, generate_press_kit
+
+
+# ==========================================
+# 🧹 INVALIDATION DU CACHE DES PAGES
+# ==========================================
+
+@receiver(page_published)
+@receiver(page_unpublished)
+def purge_page_cache(sender, instance, **kwargs):
+    purge_page(instance)
+
+
+@receiver(post_page_move)
+def purge_cache_on_move(sender, instance, **kwargs):
+    # Les URLs changent : tous les liens du site sont potentiellement faux.
+    purge_site()
+
+
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_delete, sender=SiteSettings)
+@receiver(post_save, sender=Testimonial)
+@receiver(post_delete, sender=Testimonial)
+def purge_cache_on_shared_content(sender, **kwargs):
+    purge_model(sender)
+
+
+# ==========================================
+# 🚫 CHEMINS INCONNUS (404)
+# ==========================================
+
+@receiver(page_published)
+@receiver(page_unpublished)
+@receiver(post_page_move)
+@receiver(page_slug_changed)
+@receiver(post_delete, sender=Page)
+@receiver(post_save, sender=Site)
+@receiver(post_delete, sender=Site)
+def forget_missing_paths(sender, **kwargs):
+    # Une page a pu apparaître à une adresse qui donnait une 404.
+    purge_not_found()
+
+
+# ==========================================
+# ↪️ REDIRECTIONS EN MÉMOIRE
+# ==========================================
+
+@receiver(post_save, sender=Redirect)
+@receiver(post_delete, sender=Redirect)
+@receiver(post_save, sender=Site)
+@receiver(post_delete, sender=Site)
+@receiver(post_page_move)
+@receiver(page_slug_changed)
+def refresh_redirects(sender, **kwargs):
+    # Un déplacement change les liens vers la page et crée des redirections
+    # (par lot, sans signal post_save).
+    purge_redirects()
+
+
+# ==========================================
+# 📦 EXPORT STATIQUE
+# ==========================================
+
+@receiver(page_published)
+@receiver(page_unpublished)
+def export_changed_page(sender, instance, **kwargs):
+    if get_export_dir() is not None:
+        export_pages.enqueue(page_and_ancestor_ids(instance))
+
+
+@receiver(post_delete, sender=Page)
+def export_deleted_page(sender, instance, **kwargs):
+    if get_export_dir() is not None:
+        export_pages.enqueue(page_and_ancestor_ids(instance))
+
+
+@receiver(post_page_move)
+@receiver(page_slug_changed)
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_save, sender=Testimonial)
+@receiver(post_delete, sender=Testimonial)
+def export_whole_site(sender, **kwargs):
+    # Les URLs ou un contenu affiché sur plusieurs pages ont changé.
+    if get_export_dir() is not None:
+        export_site.enqueue()
+
+
+# ==========================================
+# 🗞️ DOSSIER DE PRESSE PDF
+# ==========================================
+
+@receiver(page_published)
+@receiver(page_unpublished)
+def regenerate_press_kit(sender, instance, **kwargs):
+    # Rendu par le worker de tâches, et seulement si le contenu a changé.
+    if isinstance(instance, (AboutPage, PressPage, ShowsPage)):
+        generate_press_kit.enqueue()
+
+
+# ==========================================
+# 🖼️ RENDITIONS À L'ENVOI D'UNE IMAGE
+# ==========================================
+
+@receiver(post_save, sender=get_image_model())
+def pregenerate_renditions(sender, instance, created, **kwargs):
+    if created:
+        generate_image_renditions.enqueue(instance.pk)
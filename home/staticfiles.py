@@ -0,0 +1,169 @@
+"""
+Fichiers statiques pré-compressés.
+
+Au `collectstatic`, chaque fichier texte reçoit deux copies compressées à côté
+de lui : `.br` (Brotli, niveau maximal) et `.gz` (gzip produit par Zopfli,
+plus petit qu'un gzip classique et lisible par tous les navigateurs). La
+compression est coûteuse, elle est donc faite une seule fois, en parallèle
+sur tous les cœurs. La vue `serve_static` choisit ensuite la variante selon
+l'en-tête `Accept-Encoding`, sans aucun calcul par requête.
+"""
+
+import mimetypes
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import brotli
+import zopfli.gzip
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+COMPRESSIBLE_EXTENSIONS = {
+    ".css", ".js", ".mjs", ".map", ".json", ".svg", ".html", ".txt", ".xml",
+    ".ico", ".ttf", ".otf", ".eot",
+}
+
+# En dessous, l'en-tête de compression coûte plus qu'il ne fait gagner.
+MIN_COMPRESS_SIZE = 256
+
+# Zopfli est très lent sur les gros fichiers (JS de l'admin Wagtail) : moins
+# d'itérations au-delà de 1 Mo, comme le conseille sa documentation.
+LARGE_FILE_SIZE = 1024 * 1024
+
+# Variantes par ordre de préférence : (codage HTTP, suffixe du fichier).
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def is_compressible(name):
+    return Path(name).suffix.lower() in COMPRESSIBLE_EXTENSIONS
+
+
+def compress_file(path):
+    """
+    Écrit `path.br` et `path.gz` si le fichier y gagne. Renvoie la liste des
+    fichiers créés.
+    """
+    path = Path(path)
+    data = path.read_bytes()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return []
+
+    written = []
+    for suffix, compressed in (
+        (".br", brotli.compress(data, quality=11)),
+        (".gz", zopfli.gzip.compress(data, numiterations=5 if len(data) > LARGE_FILE_SIZE else 15)),
+    ):
+        target = path.with_name(path.name + suffix)
+        if len(compressed) < len(data):
+            target.write_bytes(compressed)
+            written.append(target)
+        elif target.exists():
+            target.unlink()
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    `ManifestStaticFilesStorage` qui écrit aussi les variantes `.br` / `.gz`
+    des fichiers versionnés (ceux référencés par `{% static %}`), après avoir
+    réduit les polices aux glyphes utilisés (`home.fonts`).
+    """
+
+    compress_workers = None  # un processus par cœur
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            # Avant le calcul des empreintes, qui doivent refléter les fichiers réduits.
+            from .fonts import subset_static_fonts
+
+            subset_static_fonts(self, paths)
+
+        hashed_names = []
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception) and is_compressible(hashed_name):
+                hashed_names.append(hashed_name)
+            yield name, hashed_name, processed
+
+        if dry_run:
+            return
+
+        files = sorted({self.path(name) for name in hashed_names})
+        with ProcessPoolExecutor(max_workers=self.compress_workers) as pool:
+            list(pool.map(compress_file, files, chunksize=8))
+
+
+# ==========================================
+# 📤 SERVICE DES FICHIERS
+# ==========================================
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=60"
+
+
+def accepted_encodings(request):
+    """Codages acceptés par le client (ceux avec q=0 sont refusés)."""
+    accepted = set()
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if coding and params not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding.lower())
+    return accepted
+
+
+def is_hashed_name(name):
+    """Vrai si le fichier est une copie versionnée par le manifeste."""
+    hashed_files = getattr(staticfiles_storage, "hashed_files", None)
+    if not hashed_files:
+        return False
+    if not hasattr(staticfiles_storage, "_hashed_names"):
+        staticfiles_storage._hashed_names = set(hashed_files.values())
+    return name in staticfiles_storage._hashed_names
+
+
+def serve_static(request, path):
+    """
+    Sert un fichier de STATIC_ROOT, dans sa variante pré-compressée si le
+    client l'accepte. Les fichiers versionnés ne changent jamais : ils sont
+    mis en cache un an par les navigateurs et les proxys.
+    """
+    try:
+        fullpath = Path(safe_join(settings.STATIC_ROOT, path))
+    except ValueError:
+        raise Http404
+    if not fullpath.is_file():
+        raise Http404
+
+    stat = fullpath.stat()
+    if not was_modified_since(request.headers.get("If-Modified-Since"), stat.st_mtime):
+        response = HttpResponseNotModified()
+    else:
+        content_type, encoding = mimetypes.guess_type(fullpath.name)
+        served, content_encoding = fullpath, encoding
+        if is_compressible(fullpath.name):
+            accepted = accepted_encodings(request)
+            for coding, suffix in ENCODINGS:
+                variant = fullpath.with_name(fullpath.name + suffix)
+                if coding in accepted and variant.is_file():
+                    served, content_encoding = variant, coding
+                    break
+        response = FileResponse(
+            served.open("rb"),
+            content_type=content_type or "application/octet-stream",
+            filename=fullpath.name,
+        )
+        if content_encoding:
+            response.headers["Content-Encoding"] = content_encoding
+        response.headers["Last-Modified"] = http_date(stat.st_mtime)
+
+    if is_compressible(fullpath.name):
+        patch_vary_headers(response, ["Accept-Encoding"])
+    response.headers["Cache-Control"] = (
+        IMMUTABLE_CACHE_CONTROL if is_hashed_name(path) else DEFAULT_CACHE_CONTROL
+    )
+    return response
@@ -0,0 +1,143 @@
+"""
+Export des envois du formulaire de contact, sans les charger en mémoire.
+
+L'export de Wagtail (liste des envois -> CSV / Excel) charge tous les envois
+puis construit le fichier en mémoire : après une annonce de tournée, des
+milliers de demandes font grimper la mémoire du worker et dépasser le délai
+de gunicorn. Ici :
+
+- les envois sont lus par paquets (curseur côté serveur avec PostgreSQL),
+  sans instancier de modèle ;
+- le CSV est envoyé ligne par ligne (`StreamingHttpResponse`) ;
+- le classeur Excel est écrit en mode "write-only" d'openpyxl dans un
+  fichier temporaire (en mémoire tant qu'il reste petit).
+
+Filtres (paramètres GET) : `date_from` / `date_to` (AAAA-MM-JJ, inclus) et
+`after` (numéro du dernier envoi déjà exporté, pour n'exporter que les
+nouveaux).
+"""
+
+import csv
+import datetime
+import tempfile
+
+from django.http import FileResponse, Http404, HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+
+from wagtail.contrib.forms.models import FormSubmission
+from wagtail.contrib.forms.utils import get_forms_for_user
+
+EXPORT_FORMATS = ("csv", "xlsx")
+EXPORT_CHUNK_SIZE = 2000
+# Au-delà, le classeur en cours d'écriture passe de la mémoire au disque.
+XLSX_SPOOL_SIZE = 2 * 1024 * 1024
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+class Echo:
+    """Pseudo-fichier pour csv.writer : renvoie la ligne au lieu de l'écrire."""
+
+    def write(self, value):
+        return value
+
+
+def parse_filters(params):
+    """Filtres de l'export depuis les paramètres GET. Lève ValueError s'ils sont invalides."""
+    filters = {}
+    for name in ("date_from", "date_to"):
+        if params.get(name):
+            filters[name] = datetime.date.fromisoformat(params[name])
+    if params.get("after"):
+        filters["after"] = int(params["after"])
+    return filters
+
+
+def get_submissions(page, date_from=None, date_to=None, after=None):
+    """(numéro, date d'envoi, données) des envois de la page, du plus ancien au plus récent."""
+    submissions = FormSubmission.objects.filter(page=page)
+    if date_from:
+        submissions = submissions.filter(submit_time__date__gte=date_from)
+    if date_to:
+        submissions = submissions.filter(submit_time__date__lte=date_to)
+    if after:
+        submissions = submissions.filter(pk__gt=after)
+    return submissions.order_by("pk").values_list("pk", "submit_time", "form_data").iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    )
+
+
+def format_value(value):
+    if isinstance(value, list):
+        return ", ".join(str(item) for item in value)
+    return value
+
+
+def iter_rows(page, filters):
+    """En-têtes puis une ligne par envoi (dates en heure locale, sans fuseau)."""
+    fields = page.get_data_fields()[1:]  # submit_time est déjà une colonne de la requête
+    yield ["N°", "Date d'envoi", *(str(label) for _, label in fields)]
+    for pk, submit_time, form_data in get_submissions(page, **filters):
+        submit_time = timezone.make_naive(timezone.localtime(submit_time))
+        yield [pk, submit_time, *(format_value(form_data.get(name)) for name, _ in fields)]
+
+
+def get_filename(page, extension):
+    return f"{page.slug}-envois-{datetime.date.today().isoformat()}.{extension}"
+
+
+def stream_csv(page, filters):
+    writer = csv.writer(Echo())
+    # BOM : Excel ouvre alors le fichier en UTF-8 (accents).
+    yield "\ufeff"
+    for row in iter_rows(page, filters):
+        yield writer.writerow(row)
+
+
+def write_xlsx(page, filters, output):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(title="Envois")
+    for row in iter_rows(page, filters):
+        cells = []
+        for value in row:
+            if isinstance(value, str):
+                # Caractères de contrôle (copiés depuis Word...) refusés par openpyxl,
+                # qui interromprait le fichier en cours d'envoi.
+                value = ILLEGAL_CHARACTERS_RE.sub("", value)
+            cell = WriteOnlyCell(worksheet, value)
+            if isinstance(value, datetime.datetime):
+                cell.number_format = "yyyy-mm-dd hh:mm"
+            cells.append(cell)
+        worksheet.append(cells)
+    workbook.save(output)
+
+
+# ==========================================
+# 📤 VUE (ADMIN WAGTAIL)
+# ==========================================
+
+def export_submissions(request, page_id, export_format):
+    if export_format not in EXPORT_FORMATS:
+        raise Http404
+    form_pages = get_forms_for_user(request.user)
+    page = get_object_or_404(form_pages, pk=page_id).specific
+    try:
+        filters = parse_filters(request.GET)
+    except ValueError:
+        return HttpResponseBadRequest("Filtres invalides : date_from / date_to en AAAA-MM-JJ, after numérique.")
+
+    if export_format == "csv":
+        response = StreamingHttpResponse(stream_csv(page, filters), content_type="text/csv; charset=utf-8")
+        response["Content-Disposition"] = f'attachment; filename="{get_filename(page, "csv")}"'
+        return response
+
+    output = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_SIZE)
+    write_xlsx(page, filters, output)
+    output.seek(0)
+    return FileResponse(
+        output, as_attachment=True, filename=get_filename(page, "xlsx"), content_type=XLSX_CONTENT_TYPE
+    )
@@ -0,0 +1,74 @@
+import logging
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django_tasks import task
+
+from wagtail.admin.mail import send_mail
+from wagtail.images import get_image_model
+
+from .export import StaticExport, get_export_dir, page_and_ancestor_ids
+from .models import AboutPage
+from .press_kit import build_press_kit
+from .renditions import generate_renditions
+
+logger = logging.getLogger(__name__)
+
+
+@task(backend="background")
+def generate_image_renditions(image_id):
+    """Pré-génère les renditions d'une image juste après son envoi."""
+    image = get_image_model().objects.filter(pk=image_id).first()
+    if image is not None:
+        generate_renditions(image)
+
+
+@task(backend="background")
+def export_pages(page_ids):
+    """Met à jour l'export statique de ces pages (voir `home.export`)."""
+    export_dir = get_export_dir()
+    if export_dir is not None:
+        StaticExport(export_dir).export_pages(page_ids)
+
+
+@task(backend="background")
+def export_site():
+    """Ré-exporte tout le site (déplacement de pages, réglages, témoignages)."""
+    export_dir = get_export_dir()
+    if export_dir is not None:
+        StaticExport(export_dir).export_site()
+
+
+@task(backend="background")
+def generate_press_kit():
+    """Régénère le dossier de presse PDF si son contenu a changé (voir `home.press_kit`)."""
+    if build_press_kit() is not None and get_export_dir() is not None:
+        # Le lien vers le PDF a changé sur la page "À propos".
+        for page in AboutPage.objects.live():
+            export_pages.enqueue(page_and_ancestor_ids(page))
+
+
+@task(backend="background")
+def send_contact_email(subject, body, recipients, from_email, submission_id=None, attempt=1):
+    """
+    Envoie l'email d'une soumission du formulaire de contact. En cas d'échec
+    SMTP, une nouvelle tentative est programmée avec un délai qui double à
+    chaque essai (`CONTACT_EMAIL_RETRY_DELAY`, `CONTACT_EMAIL_MAX_ATTEMPTS`).
+    """
+    try:
+        send_mail(subject, body, recipients, from_email)
+    except (smtplib.SMTPException, OSError):
+        max_attempts = getattr(settings, "CONTACT_EMAIL_MAX_ATTEMPTS", 5)
+        if attempt < max_attempts:
+            delay = getattr(settings, "CONTACT_EMAIL_RETRY_DELAY", 60) * 2 ** (attempt - 1)
+            send_contact_email.using(run_after=timezone.now() + timedelta(seconds=delay)).enqueue(
+                subject, body, recipients, from_email, submission_id=submission_id, attempt=attempt + 1
+            )
+            logger.warning(
+                "Contact email for submission %s failed (attempt %d/%d), retrying in %ds",
+                submission_id, attempt, max_attempts, delay,
+            )
+        # L'échec reste visible dans les résultats de tâches de l'admin.
+        raise
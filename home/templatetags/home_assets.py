@@ -0,0 +1,81 @@
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from home.assets import get_cdn_urls, get_vendor_manifest
+from home.critical_css import (
+    GLOBAL_STYLESHEETS,
+    get_build_manifest,
+    get_critical_css,
+    page_stylesheet,
+)
+
+register = template.Library()
+
+# Feuille chargée sans bloquer l'affichage (le CSS critique est déjà en ligne).
+DEFERRED_STYLESHEET = (
+    '<link rel="preload" href="{0}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+    '<noscript><link rel="stylesheet" href="{0}"></noscript>'
+)
+
+
+@register.simple_tag
+def vendor_styles():
+    """
+    Feuille de style des bibliothèques (Font Awesome, slick, polices), chargée
+    en différé, avec préchargement des polices d'icônes. Sans `vendor_assets`,
+    liens vers les CDN.
+    """
+    manifest = get_vendor_manifest()
+    if manifest is None:
+        css, _ = get_cdn_urls()
+        return format_html_join("\n", '<link rel="stylesheet" href="{}">', ((url,) for url in css))
+
+    fonts = format_html_join(
+        "\n",
+        '<link rel="preload" href="{}" as="font" type="font/woff2" crossorigin>',
+        ((static(name),) for name in manifest["preload_fonts"]),
+    )
+    return format_html(
+        '<link rel="preload" href="{}" as="script">\n{}\n{}',
+        static(manifest["js"]),
+        fonts,
+        format_html(DEFERRED_STYLESHEET, static(manifest["css"])),
+    )
+
+
+@register.simple_tag(takes_context=True)
+def page_styles(context):
+    """
+    CSS critique de la page en ligne, puis `base.css`, les styles partagés et
+    ceux de la page, chargés sans bloquer l'affichage. Sans `build_css`,
+    simples liens vers `base.css` et la feuille de la page.
+    """
+    template_name = getattr(context.template, "name", None)
+    manifest = get_build_manifest()
+    page = manifest["pages"].get(template_name) if manifest else None
+    if page is None:
+        stylesheets = list(GLOBAL_STYLESHEETS)
+        if template_name and finders.find(page_stylesheet(template_name)):
+            stylesheets.append(page_stylesheet(template_name))
+        return format_html_join("\n", '<link rel="stylesheet" href="{}">', ((static(name),) for name in stylesheets))
+
+    deferred = format_html_join(
+        "\n",
+        DEFERRED_STYLESHEET,
+        ((static(name),) for name in [*manifest["global"], manifest["shared"], page["css"]] if name),
+    )
+    # Contenu produit par build_css à partir de nos propres feuilles.
+    return format_html("<style>{}</style>\n{}", mark_safe(get_critical_css(page["critical"])), deferred)
+
+
+@register.simple_tag
+def vendor_scripts():
+    """jQuery et slick, en un seul fichier (ou depuis les CDN)."""
+    manifest = get_vendor_manifest()
+    if manifest is None:
+        _, js = get_cdn_urls()
+        return format_html_join("\n", '<script src="{}"></script>', ((url,) for url in js))
+    return format_html('<script src="{}"></script>', static(manifest["js"]))
@@ -0,0 +1,116 @@
+import re
+from functools import cache
+
+from django import template
+from django.conf import settings
+from django.template.base import Token
+from PIL import features
+
+from wagtail.images.templatetags.wagtailimages_tags import PictureNode, image
+
+register = template.Library()
+
+# Format de l'<img> de repli, compris par tous les navigateurs.
+FALLBACK_FORMAT = "jpeg"
+
+
+@cache
+def get_image_formats():
+    """
+    Formats proposés dans les <source>, du plus léger au plus lourd. L'AVIF
+    n'est ajouté que si Pillow a été compilé avec libavif.
+    """
+    formats = [fmt for fmt in ("avif", "webp") if features.check(fmt)]
+    return formats + [FALLBACK_FORMAT]
+
+
+def get_densities():
+    return getattr(settings, "IMAGE_SRCSET_DENSITIES", (1, 2, 3))
+
+
+# Opérations de redimensionnement dont on sait multiplier les dimensions.
+SIZE_OPERATION_RE = re.compile(r"^(?:(fill|max|min)-(\d+)x(\d+)(-c\d+)?|(width|height)-(\d+))$")
+
+
+def _parse_size_spec(spec):
+    match = SIZE_OPERATION_RE.match(spec)
+    if match is None:
+        raise template.TemplateSyntaxError(f"Cannot build a srcset from the filter {spec!r}")
+    return match.groups()
+
+
+def get_density_spec(spec, densities):
+    """
+    Transforme un filtre en déclinaison multi-résolution pour Wagtail :
+    "fill-300x400" devient "fill-{300x400,600x800,900x1200}".
+    """
+    operation, width, height, crop, single_operation, size = _parse_size_spec(spec)
+    if single_operation:
+        options = [str(int(size) * d) for d in densities]
+        return f"{single_operation}-{{{','.join(options)}}}"
+    options = [f"{int(width) * d}x{int(height) * d}" for d in densities]
+    return f"{operation}-{{{','.join(options)}}}{crop or ''}"
+
+
+def get_display_width(spec):
+    """Largeur d'affichage (en px CSS) d'un filtre 1x, si elle est connue."""
+    operation, width, height, crop, single_operation, size = _parse_size_spec(spec)
+    if single_operation == "height":
+        return None
+    return int(size or width)
+
+
+class ModernPictureNode(PictureNode):
+    def __init__(self, image_expr, filter_specs, **kwargs):
+        # Le filtre de format est ajouté à la compilation du gabarit, ce qui
+        # permet aussi à `home.renditions` de pré-générer ces variantes.
+        format_spec = "format-{%s}" % ",".join(get_image_formats())
+        super().__init__(image_expr, filter_specs + [format_spec], **kwargs)
+
+
+@register.tag
+def modern_picture(parser, token):
+    """
+    Comme `{% picture %}`, avec les variantes AVIF / WebP générées
+    automatiquement et un JPEG de repli :
+
+        {% modern_picture page.hero_image fill-1920x1080 class="hero" alt="" %}
+    """
+    tag_name, _, arguments = token.contents.partition(" ")
+    node = image(parser, Token(token.token_type, f"picture {arguments}", token.position, token.lineno))
+    return ModernPictureNode(
+        node.image_expr,
+        node.filter_specs,
+        output_var_name=node.output_var_name,
+        attrs=node.attrs,
+    )
+
+
+class ResponsivePictureNode(ModernPictureNode):
+    def __init__(self, image_expr, filter_specs, **kwargs):
+        size_spec, *other_specs = filter_specs
+        density_spec = get_density_spec(size_spec, get_densities())
+        super().__init__(image_expr, [density_spec, *other_specs], **kwargs)
+
+
+@register.tag
+def responsive_picture(parser, token):
+    """
+    Comme `{% modern_picture %}`, en déclinant le premier filtre (fill, max,
+    min, width ou height) en 1x/2x/3x (`IMAGE_SRCSET_DENSITIES`) dans le
+    `srcset`. Sans attribut `sizes`, la largeur 1x du filtre est utilisée :
+
+        {% responsive_picture show.poster fill-300x400 sizes="(max-width: 480px) 100vw, 300px" %}
+    """
+    tag_name, _, arguments = token.contents.partition(" ")
+    node = image(parser, Token(token.token_type, f"picture {arguments}", token.position, token.lineno))
+    attrs = node.attrs
+    display_width = get_display_width(node.filter_specs[0])
+    if "sizes" not in attrs and display_width and not node.output_var_name:
+        attrs["sizes"] = parser.compile_filter(f'"{display_width}px"')
+    return ResponsivePictureNode(
+        node.image_expr,
+        node.filter_specs,
+        output_var_name=node.output_var_name,
+        attrs=attrs,
+    )
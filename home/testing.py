@@ -0,0 +1,34 @@
+"""
+Outils pour les tests.
+
+`QueryBudgetMixin.assertWithinQueryBudget(page)` rend une page sans cache et
+échoue si elle exécute plus de requêtes SQL que le budget de son type dans
+`PAGE_QUERY_BUDGETS` : une boucle de gabarit qui déclenche une requête par
+élément (N+1) est repérée dès les tests.
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .metrics import get_query_budget
+
+
+class QueryBudgetMixin:
+    def assertWithinQueryBudget(self, page):
+        page_type = page.specific_class._meta.label_lower
+        budget = get_query_budget(page_type)
+        if budget is None:
+            self.fail(f"Pas de budget pour {page_type} dans PAGE_QUERY_BUDGETS")
+
+        # Premier rendu pour créer réglages et renditions (pré-générées en
+        # production), puis rendu complet : ni page ni réglages en cache.
+        self.client.get(page.url)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(page.url)
+        self.assertEqual(response.status_code, 200)
+        if len(queries) > budget:
+            details = "\n".join(f"  {query['sql']}" for query in queries.captured_queries)
+            self.fail(f"{page_type} : {len(queries)} requêtes SQL pour un budget de {budget}\n{details}")
+        return response
@@ -0,0 +1,42 @@
+from django.urls import path, reverse
+
+from wagtail import hooks
+from wagtail.admin.widgets import Button
+
+from .metrics import set_page_type
+from .models import ContactPage
+from .submissions import EXPORT_FORMATS, export_submissions
+
+
+@hooks.register("before_serve_page")
+def record_page_type(page, request, serve_args, serve_kwargs):
+    # Les mesures de la requête sont cumulées par type de page.
+    set_page_type(page.specific_class._meta.label_lower)
+
+
+# ==========================================
+# 📤 EXPORT DES ENVOIS DU FORMULAIRE
+# ==========================================
+
+@hooks.register("register_admin_urls")
+def register_submissions_export_urls():
+    return [
+        path(
+            "contact/<int:page_id>/export.<str:export_format>",
+            export_submissions,
+            name="home_export_submissions",
+        ),
+    ]
+
+
+@hooks.register("register_page_header_buttons")
+def submissions_export_buttons(page, user, view_name, next_url=None):
+    if not isinstance(page, ContactPage) or not page.permissions_for_user(user).can_edit():
+        return
+    for priority, export_format in enumerate(EXPORT_FORMATS, start=80):
+        yield Button(
+            f"Exporter les envois ({export_format.upper()})",
+            reverse("home_export_submissions", args=[page.pk, export_format]),
+            icon_name="download",
+            priority=priority,
+        )
@@ -0,0 +1,134 @@
+"""
+Autocomplétion de la recherche.
+
+Les libellés proposés (titres des pages, spectacles à venir avec leurs villes
+et salles, noms des publications de la revue de presse) sont gardés en
+mémoire dans chaque worker, sous forme d'un tableau trié de clés sans accents.
+Une recherche est une simple dichotomie (`bisect`) : aucune requête SQL.
+
+Chaque mot d'un libellé est une clé : "bell" trouve "Radiant-Bellevue".
+L'index est reconstruit quand la version `autocomplete` (voir `home.cache`)
+change, c'est-à-dire après une publication, ou le lendemain (spectacles passés).
+"""
+
+import re
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date
+
+from wagtail.models import Page
+
+from home.cache import get_version
+from home.models import PressPage, Show
+
+from .index import fold
+
+AUTOCOMPLETE_VERSION = "autocomplete"
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+
+# Nombre maximal de clés parcourues pour une requête très courte ("l").
+MAX_SCANNED_KEYS = 500
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    label: str
+    url: str
+    kind: str
+
+    def as_dict(self):
+        return {"label": self.label, "url": self.url, "type": self.kind}
+
+
+def _word_keys(label):
+    """Clés d'un libellé : le libellé entier puis la suite à chaque mot."""
+    folded = fold(label).strip()
+    keys = [folded]
+    for match in re.finditer(r"[\W_]+(?=\w)", folded):
+        keys.append(folded[match.end():])
+    return keys
+
+
+def get_suggestions():
+    """Toutes les suggestions possibles, lues en base."""
+    suggestions = []
+    for page in Page.objects.live().public().exclude(depth=1).specific():
+        url = page.get_url()
+        if url is None:
+            continue
+        suggestions.append(Suggestion(page.title, url, "page"))
+
+        if isinstance(page, PressPage):
+            for block in page.press_articles:
+                name = block.value.get("publication_name")
+                if name:
+                    suggestions.append(Suggestion(name, url, "press"))
+
+    shows = Show.objects.live().upcoming().select_related("page")
+    for show in shows:
+        url = show.page.get_url()
+        if url is None:
+            continue
+        suggestions.append(Suggestion(show.title, url, "show"))
+        if show.city:
+            suggestions.append(Suggestion(show.city, url, "city"))
+        if show.venue:
+            suggestions.append(Suggestion(show.venue, url, "venue"))
+    return suggestions
+
+
+class AutocompleteIndex:
+    def __init__(self):
+        self.entries = ([], [])  # (clés triées, suggestion de chaque clé)
+        self.version = None
+        self.lock = threading.Lock()
+
+    def build(self, suggestions, version=None):
+        entries = sorted(
+            {(key, suggestion) for suggestion in suggestions for key in _word_keys(suggestion.label)},
+            key=lambda entry: (entry[0], entry[1].label),
+        )
+        # Un seul attribut remplacé : une recherche concurrente voit l'ancien
+        # ou le nouvel index, jamais un mélange.
+        self.entries = ([key for key, _ in entries], [s for _, s in entries])
+        self.version = version
+
+    def ensure_current(self):
+        version = (get_version(AUTOCOMPLETE_VERSION), date.today().isoformat())
+        if version == self.version:
+            return
+        with self.lock:
+            if version != self.version:
+                self.build(get_suggestions(), version)
+
+    def lookup(self, query, limit=DEFAULT_LIMIT):
+        """Suggestions dont un mot commence par `query`, libellés complets d'abord."""
+        prefix = fold(query or "").strip()
+        if not prefix:
+            return []
+        keys, suggestions = self.entries
+        start = bisect_left(keys, prefix)
+
+        full, partial, seen = [], [], set()
+        for position in range(start, min(start + MAX_SCANNED_KEYS, len(keys))):
+            key = keys[position]
+            if not key.startswith(prefix):
+                break
+            suggestion = suggestions[position]
+            if suggestion in seen:
+                continue
+            seen.add(suggestion)
+            (full if fold(suggestion.label).strip() == key else partial).append(suggestion)
+            if len(full) >= limit:
+                break
+        return (full + partial)[:limit]
+
+
+autocomplete_index = AutocompleteIndex()
+
+
+def autocomplete(query, limit=DEFAULT_LIMIT):
+    autocomplete_index.ensure_current()
+    return autocomplete_index.lookup(query, limit)
@@ -0,0 +1,253 @@
+"""
+Index de recherche plein texte SQLite FTS5.
+
+Une table virtuelle `search_pageindex` contient, pour chaque page publiée,
+son titre et le texte de ses `search_fields` (RichText et StreamField
+compris). Le tokenizer `unicode61 remove_diacritics 2` ignore la casse et les
+accents ; les mots de la requête passent par un raciniseur français léger
+puis sont cherchés comme préfixes ("spectacles" -> `spectacl*`), ce qui
+trouve aussi les pluriels et féminins tout en gardant le texte d'origine
+pour les extraits surlignés.
+
+Les résultats sont classés par BM25 (titre pondéré) et paginés par curseur
+(score, id) : ni COUNT(*) ni OFFSET, le coût d'une page ne dépend pas du
+nombre total de résultats.
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass, field
+
+from django.db import connection
+from django.utils.encoding import force_str
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from wagtail.models import Page
+from wagtail.search.index import SearchField
+
+INDEX_TABLE = "search_pageindex"
+
+# Poids BM25 des colonnes (titre, corps).
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+SNIPPET_TOKENS = 24
+MAX_QUERY_TERMS = 10
+
+# Marqueurs insérés par snippet() puis remplacés après échappement HTML.
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+STOP_WORDS = {
+    "a", "au", "aux", "avec", "ce", "ces", "d", "dans", "de", "des", "du",
+    "en", "et", "l", "la", "le", "les", "ou", "par", "pour", "sur", "un", "une",
+}
+
+# Terminaisons retirées par le raciniseur, des plus longues aux plus courtes.
+# La racine sert de préfixe : elle doit être commune à toutes les formes
+# ("journaux" -> "journa", qui trouve aussi "journal").
+FRENCH_SUFFIXES = (
+    ("iennes", "ien"), ("ienne", "ien"), ("euses", "eu"), ("euse", "eu"),
+    ("eaux", "eau"), ("aux", "a"), ("ees", ""), ("ee", ""), ("es", ""),
+    ("s", ""), ("x", ""), ("e", ""),
+)
+
+
+def is_fts_available():
+    return connection.vendor == "sqlite"
+
+
+# ==========================================
+# ✂️ RACINISATION
+# ==========================================
+
+def fold(text):
+    """Minuscules sans accents ("Comédienne" -> "comedienne")."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def light_stem(word):
+    """
+    Raciniseur français léger : retire les marques de pluriel et de féminin
+    sans jamais raccourcir un mot à moins de 4 lettres.
+    """
+    word = fold(word)
+    for suffix, replacement in FRENCH_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) + len(replacement) >= 4:
+            return word[: -len(suffix)] + replacement
+    return word
+
+
+def build_match_query(query_string):
+    """
+    Transforme la saisie du visiteur en requête FTS5 (tous les mots doivent
+    être présents). Renvoie une chaîne vide s'il n'y a rien à chercher.
+    """
+    terms = []
+    for word in re.findall(r"\w+", query_string or ""):
+        word = fold(word)
+        if word in STOP_WORDS or word in terms:
+            continue
+        terms.append(word)
+    # Les guillemets neutralisent la syntaxe FTS5 (NEAR, OR, colonnes...).
+    return " ".join(f'"{light_stem(word)}"*' for word in terms[:MAX_QUERY_TERMS])
+
+
+# ==========================================
+# 🗂️ INDEXATION
+# ==========================================
+
+def _prepare_value(value):
+    if isinstance(value, (list, tuple)):
+        return " ".join(_prepare_value(item) for item in value)
+    if isinstance(value, dict):
+        return " ".join(_prepare_value(item) for item in value.values())
+    return force_str(value) if value is not None else ""
+
+
+def get_page_text(page):
+    """Renvoie (titre, corps) à indexer pour une page."""
+    page = page.specific
+    body = []
+    for search_field in page.get_search_fields():
+        if isinstance(search_field, SearchField) and search_field.field_name != "title":
+            body.append(_prepare_value(search_field.get_value(page)))
+    if page.search_description:
+        body.append(page.search_description)
+    return page.title, " ".join(text for text in body if text)
+
+
+def index_page(page):
+    """Ajoute ou met à jour une page (la retire si elle n'est plus publiée)."""
+    if not is_fts_available():
+        return
+    if not page.live:
+        remove_page(page)
+        return
+    title, body = get_page_text(page)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {INDEX_TABLE} WHERE rowid = %s", [page.pk])
+        cursor.execute(
+            f"INSERT INTO {INDEX_TABLE} (rowid, title, body) VALUES (%s, %s, %s)",
+            [page.pk, title, body],
+        )
+
+
+def remove_page(page):
+    if not is_fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {INDEX_TABLE} WHERE rowid = %s", [page.pk])
+
+
+def rebuild_index():
+    """Réindexe toutes les pages publiées. Renvoie le nombre de pages."""
+    if not is_fts_available():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {INDEX_TABLE}")
+    count = 0
+    for page in Page.objects.live().specific().iterator():
+        index_page(page)
+        count += 1
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {INDEX_TABLE} ({INDEX_TABLE}) VALUES ('optimize')")
+    return count
+
+
+# ==========================================
+# 🔍 RECHERCHE
+# ==========================================
+
+@dataclass
+class SearchHit:
+    page: Page
+    snippet: str = ""
+
+
+@dataclass
+class SearchResults:
+    hits: list = field(default_factory=list)
+    next_cursor: str = None
+
+
+def _parse_cursor(cursor):
+    try:
+        score, page_id = cursor.split("_")
+        return float(score), int(page_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _highlight(snippet):
+    return mark_safe(
+        escape(snippet).replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_END, "</mark>")
+    )
+
+
+def search_pages(query_string, after=None, per_page=10):
+    """
+    Pages publiées correspondant à la recherche, les plus pertinentes
+    d'abord. `after` est le curseur renvoyé par la page de résultats
+    précédente.
+    """
+    if not is_fts_available():
+        return _fallback_search(query_string, after, per_page)
+
+    match = build_match_query(query_string)
+    if not match:
+        return SearchResults()
+
+    sql = (
+        f"SELECT page_id, score FROM ("
+        f" SELECT rowid AS page_id, bm25({INDEX_TABLE}, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS score"
+        f" FROM {INDEX_TABLE} WHERE {INDEX_TABLE} MATCH %s)"
+    )
+    params = [match]
+    position = _parse_cursor(after)
+    if position:
+        sql += " WHERE score > %s OR (score = %s AND page_id > %s)"
+        params += [position[0], position[0], position[1]]
+    sql += " ORDER BY score, page_id LIMIT %s"
+    params.append(per_page + 1)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        page_rows, extra = rows[:per_page], rows[per_page:]
+        if not page_rows:
+            return SearchResults()
+
+        ids = [page_id for page_id, score in page_rows]
+        placeholders = ", ".join(["%s"] * len(ids))
+        cursor.execute(
+            f"SELECT rowid, snippet({INDEX_TABLE}, -1, char(2), char(3), '…', {SNIPPET_TOKENS})"
+            f" FROM {INDEX_TABLE} WHERE {INDEX_TABLE} MATCH %s AND rowid IN ({placeholders})",
+            [match, *ids],
+        )
+        snippets = dict(cursor.fetchall())
+
+    pages = Page.objects.live().public().in_bulk(ids)
+    hits = [
+        SearchHit(pages[page_id], _highlight(snippets.get(page_id, "")))
+        for page_id in ids
+        if page_id in pages
+    ]
+    last_id, last_score = page_rows[-1]
+    next_cursor = f"{last_score!r}_{last_id}" if extra else None
+    return SearchResults(hits, next_cursor)
+
+
+def _fallback_search(query_string, after, per_page):
+    """Autres bases de données : recherche Wagtail, curseur = décalage."""
+    if not query_string:
+        return SearchResults()
+    try:
+        offset = max(int(after or 0), 0)
+    except ValueError:
+        offset = 0
+    pages = list(Page.objects.live().public().search(query_string)[offset:offset + per_page + 1])
+    next_cursor = str(offset + per_page) if len(pages) > per_page else None
+    return SearchResults([SearchHit(page) for page in pages[:per_page]], next_cursor)
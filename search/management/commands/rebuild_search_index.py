@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from search.index import is_fts_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de recherche plein texte (FTS5) des pages publiées."
+
+    def handle(self, *args, **options):
+        if not is_fts_available():
+            self.stdout.write("Base non SQLite : la recherche Wagtail est utilisée, rien à faire.")
+            return
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Pages indexées : {count}"))
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+from search.index import INDEX_TABLE
+
+
+def create_index_table(apps, schema_editor):
+    # Table FTS5 propre à SQLite : les autres bases gardent la recherche Wagtail.
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {INDEX_TABLE} USING fts5("
+        "title, body, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+
+
+def drop_index_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {INDEX_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = []
+
+    operations = [
+        migrations.RunPython(create_index_table, drop_index_table),
+    ]
@@ -0,0 +1,164 @@
+"""
+Cache des résultats de recherche et compteurs de popularité.
+
+Les résultats sont gardés en mémoire dans chaque worker (LRU) pour la requête
+normalisée ; toute publication change la version `search` (voir
+`home.cache`) et vide le cache. Les recherches les plus populaires de la
+semaine sont alors recalculées par la tâche `warm_search_cache`, hors
+requête web, et rangées dans le cache Django partagé sous la nouvelle
+version : chaque worker y reprend la première page de résultats au lieu de
+relancer la recherche.
+
+Les compteurs (pour `wagtail.contrib.search_promotions`) sont cumulés en
+mémoire et envoyés à la file de tâches par lots, au plus une fois par
+`SEARCH_HITS_FLUSH_INTERVAL` : une vague de recherches identiques ne fait
+plus une écriture en base par visiteur. Au pire, le dernier intervalle d'un
+worker redémarré n'est pas compté.
+"""
+
+import hashlib
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from wagtail.contrib.search_promotions.models import Query
+from wagtail.search.utils import normalise_query_string
+
+from home.cache import PAGE_CACHE_PREFIX, get_version
+from home.metrics import record_cache
+
+from .index import search_pages
+from .tasks import record_search_hits
+
+SEARCH_VERSION = "search"
+RESULTS_PER_PAGE = 10
+SHARED_RESULTS_TIMEOUT = 60 * 60 * 24
+
+
+def get_cache_size():
+    return getattr(settings, "SEARCH_RESULT_CACHE_SIZE", 256)
+
+
+# ==========================================
+# 🗄️ RÉSULTATS EN CACHE (LRU)
+# ==========================================
+
+class SearchResultCache:
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.version = None
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            results = self.entries.get(key)
+            if results is not None:
+                self.entries.move_to_end(key)
+            return results
+
+    def set(self, key, results):
+        with self.lock:
+            self.entries[key] = results
+            self.entries.move_to_end(key)
+            while len(self.entries) > get_cache_size():
+                self.entries.popitem(last=False)
+
+    def ensure_current(self):
+        """Vide le cache après une publication (les recherches populaires sont recalculées en tâche de fond)."""
+        version = get_version(SEARCH_VERSION)
+        if version == self.version:
+            return
+        with self.lock:
+            self.entries.clear()
+            self.version = version
+
+
+result_cache = SearchResultCache()
+
+
+def get_popular_queries():
+    limit = getattr(settings, "SEARCH_POPULAR_QUERIES", 20)
+    if not limit:
+        return []
+    since = timezone.now().date() - timedelta(days=7)
+    return list(
+        Query.get_most_popular(date_since=since).values_list("query_string", flat=True)[:limit]
+    )
+
+
+def shared_results_key(version, query_string):
+    digest = hashlib.md5(query_string.encode()).hexdigest()
+    return f"{PAGE_CACHE_PREFIX}:search:{version}:{digest}"
+
+
+def warm_popular_searches():
+    """
+    Calcule la première page des recherches populaires sous la version
+    courante, dans le cache partagé. Renvoie le nombre de recherches.
+    """
+    version = get_version(SEARCH_VERSION)
+    query_strings = get_popular_queries()
+    cache.set_many(
+        {
+            shared_results_key(version, query_string): search_pages(query_string, per_page=RESULTS_PER_PAGE)
+            for query_string in query_strings
+        },
+        SHARED_RESULTS_TIMEOUT,
+    )
+    return len(query_strings)
+
+
+def cached_search(query_string, after=None):
+    """`search_pages` pour la requête normalisée, servi depuis la mémoire si possible."""
+    query_string = normalise_query_string(query_string or "")
+    if not query_string:
+        return search_pages("")
+    result_cache.ensure_current()
+    key = (query_string, after or None)
+    results = result_cache.get(key)
+    if results is None and not after:
+        # Recherche populaire préparée par `warm_search_cache`.
+        results = cache.get(shared_results_key(result_cache.version, query_string))
+        if results is not None:
+            result_cache.set(key, results)
+    record_cache("search", hit=results is not None)
+    if results is None:
+        results = search_pages(query_string, after=after, per_page=RESULTS_PER_PAGE)
+        result_cache.set(key, results)
+    return results
+
+
+# ==========================================
+# 📈 COMPTEURS DE RECHERCHES
+# ==========================================
+
+class SearchHitCounter:
+    def __init__(self):
+        self.hits = Counter()
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+
+    def add(self, query_string):
+        query_string = normalise_query_string(query_string or "")
+        if not query_string:
+            return
+        with self.lock:
+            self.hits[query_string] += 1
+        interval = getattr(settings, "SEARCH_HITS_FLUSH_INTERVAL", 60)
+        if time.monotonic() - self.last_flush >= interval:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            hits, self.hits = self.hits, Counter()
+            self.last_flush = time.monotonic()
+        if hits:
+            record_search_hits.enqueue(dict(hits), timezone.now().date().isoformat())
+
+
+hit_counter = SearchHitCounter()
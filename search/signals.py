@@ -0,0 +1,52 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from wagtail.models import Page
+from wagtail.signals import page_published, page_unpublished, post_page_move
+
+from home.cache import bump_version
+
+from .autocomplete import AUTOCOMPLETE_VERSION
+from .index import index_page, remove_page
+from .query_cache import SEARCH_VERSION
+from .tasks import warm_search_cache
+
+
+# ==========================================
+# 🔍 MISE À JOUR DE L'INDEX DE RECHERCHE
+# ==========================================
+
+@receiver(page_published)
+def index_published_page(sender, instance, **kwargs):
+    index_page(instance)
+
+
+@receiver(page_unpublished)
+def unindex_unpublished_page(sender, instance, **kwargs):
+    remove_page(instance)
+
+
+@receiver(post_delete)
+def unindex_deleted_page(sender, instance, **kwargs):
+    if isinstance(instance, Page):
+        remove_page(instance)
+        purge_search_caches()
+
+
+# ==========================================
+# ⌨️ AUTOCOMPLÉTION ET RÉSULTATS EN CACHE
+# ==========================================
+
+def purge_search_caches():
+    # Chaque worker reconstruit son index et vide ses résultats en mémoire à
+    # la requête suivante ; les recherches populaires sont recalculées après
+    # le commit, par le worker de tâches.
+    bump_version(AUTOCOMPLETE_VERSION, SEARCH_VERSION)
+    warm_search_cache.enqueue()
+
+
+@receiver(page_published)
+@receiver(page_unpublished)
+@receiver(post_page_move)
+def refresh_search_caches(sender, **kwargs):
+    purge_search_caches()
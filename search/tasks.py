@@ -0,0 +1,25 @@
+from django.db.models import F
+from django_tasks import task
+
+from wagtail.contrib.search_promotions.models import Query, QueryDailyHits
+
+
+@task(backend="background")
+def record_search_hits(hits, day):
+    """
+    Enregistre un lot de compteurs de recherches ({requête: nombre}) pour la
+    journée `day` (format ISO), en une mise à jour par requête.
+    """
+    for query_string, count in hits.items():
+        query = Query.get(query_string)
+        daily_hits, _ = QueryDailyHits.objects.get_or_create(query=query, date=day)
+        QueryDailyHits.objects.filter(pk=daily_hits.pk).update(hits=F("hits") + count)
+
+
+@task(backend="background")
+def warm_search_cache():
+    """Prépare les recherches populaires après une publication, pour tous les workers."""
+    # Importé ici : `query_cache` importe déjà ce module.
+    from .query_cache import warm_popular_searches
+
+    return warm_popular_searches()
@@ -1,46 +1,41 @@
-from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.http import JsonResponse
 from django.template.response import TemplateResponse
+from django.utils.cache import patch_cache_control
 
-from wagtail.models import Page
-
-# To enable logging of search queries for use with the "Promoted search results" module
-# <https://docs.wagtail.org/en/stable/reference/contrib/searchpromotions.html>
-# uncomment the following line and the lines indicated in the search function
-# (after adding wagtail.contrib.search_promotions to INSTALLED_APPS):
-
-# from wagtail.contrib.search_promotions.models import Query
+from .autocomplete import DEFAULT_LIMIT, MAX_LIMIT, autocomplete
+from .query_cache import cached_search, hit_counter
 
 
 def search(request):
     search_query = request.GET.get("query", None)
-    page = request.GET.get("page", 1)
-
-    # Search
-    if search_query:
-        search_results = Page.objects.live().search(search_query)
+    after = request.GET.get("after", None)
 
-        # To log this query for use with the "Promoted search results" module:
+    # Search (index FTS5, paginé par curseur : pas de COUNT(*) sur les résultats)
+    results = cached_search(search_query, after=after)
 
-        # query = Query.get(search_query)
-        # query.add_hit()
-
-    else:
-        search_results = Page.objects.none()
-
-    # Pagination
-    paginator = Paginator(search_results, 10)
-    try:
-        search_results = paginator.page(page)
-    except PageNotAnInteger:
-        search_results = paginator.page(1)
-    except EmptyPage:
-        search_results = paginator.page(paginator.num_pages)
+    # Statistiques pour les "Promoted search results", envoyées par lots
+    if not after:
+        hit_counter.add(search_query)
 
     return TemplateResponse(
         request,
         "search/search.html",
         {
             "search_query": search_query,
-            "search_results": search_results,
+            "search_results": results.hits,
+            "next_cursor": results.next_cursor,
+            "is_first_page": not after,
         },
     )
+
+
+def search_autocomplete(request):
+    """Suggestions JSON pour la saisie en cours, servies depuis la mémoire."""
+    try:
+        limit = min(max(int(request.GET.get("limit", DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        limit = DEFAULT_LIMIT
+    suggestions = autocomplete(request.GET.get("q", ""), limit)
+    response = JsonResponse({"results": [suggestion.as_dict() for suggestion in suggestions]})
+    patch_cache_control(response, public=True, max_age=60)
+    return response
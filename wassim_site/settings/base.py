@@ -2,8 +2,11 @@
 Django settings for wassim_site project.
 """
 
+import os
 from pathlib import Path
 
+from wassim_site.database import database_config_from_env
+
 # Chemins de base
 PROJECT_DIR = Path(__file__).resolve().parent.parent
 BASE_DIR = PROJECT_DIR.parent
@@ -17,9 +20,11 @@ ALLOWED_HOSTS = []
 INSTALLED_APPS = [
     "home",
     "search",
+    "api",
     "wagtail.contrib.settings",  # Pour les réseaux sociaux
     "wagtail.contrib.forms",
     "wagtail.contrib.redirects",
+    "wagtail.contrib.search_promotions",  # Statistiques des recherches
     "wagtail.embeds",
     "wagtail.sites",
     "wagtail.users",
@@ -32,6 +37,9 @@ INSTALLED_APPS = [
     "modelcluster",
     "taggit",
     "django_filters",
+    "rest_framework",
+    "django_tasks",
+    "django_tasks.backends.database",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -42,13 +50,17 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "home.metrics.MetricsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "wagtail.contrib.redirects.middleware.RedirectMiddleware",
+    # Variante de wagtail.contrib.redirects : index en mémoire, sans requête SQL par 404
+    "home.redirects.RedirectMiddleware",
+    "home.not_found.NotFoundMiddleware",
+    "home.middleware.PageCacheMiddleware",
 ]
 
 ROOT_URLCONF = "wassim_site.urls"
@@ -75,14 +87,92 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "wassim_site.wsgi.application"
 
-# Base de données
+# Base de données : DATABASE_URL (PostgreSQL en production), SQLite sinon.
+# Voir wassim_site/database.py (connexions persistantes, pool, pragmas SQLite).
 DATABASES = {
+    "default": database_config_from_env(default_url=f"sqlite:///{BASE_DIR / 'db.sqlite3'}"),
+}
+
+# Cache (pages Wagtail, réglages...)
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "wassim_site",
+        # Pages, lectures de modèles et versions partagent ce cache : assez de
+        # place pour que les pages avec paramètres n'évincent pas tout le reste.
+        "OPTIONS": {"MAX_ENTRIES": 5000},
     }
 }
 
+# Tâches de fond : "default" reste synchrone pour les tâches internes de Wagtail,
+# "background" est traité par `python manage.py db_worker --backend background`.
+TASKS = {
+    "default": {
+        "BACKEND": "django_tasks.backends.immediate.ImmediateBackend",
+    },
+    "background": {
+        "BACKEND": "django_tasks.backends.database.DatabaseBackend",
+    },
+}
+
+# Emails du formulaire de contact (envoyés par la file "background")
+EMAIL_TIMEOUT = 20
+CONTACT_EMAIL_MAX_ATTEMPTS = 5
+CONTACT_EMAIL_RETRY_DELAY = 60  # secondes, doublé à chaque nouvel essai
+
+# Durée de vie d'une page en cache (secondes). 0 désactive le cache des pages.
+PAGE_CACHE_TIMEOUT = 60 * 60
+
+# Export statique du site (manage.py export_static, voir home/export.py).
+# Si défini, chaque publication met aussi à jour l'export en tâche de fond.
+STATIC_EXPORT_DIR = None
+
+# Envoi des documents (home/documents.py) : None pour les envoyer depuis
+# Django (os.sendfile, Range), "nginx" (X-Accel-Redirect vers
+# DOCUMENTS_SENDFILE_URL, location "internal" sur MEDIA_ROOT) ou "xsendfile".
+DOCUMENTS_SENDFILE = None
+DOCUMENTS_SENDFILE_URL = "/protected-media/"
+
+# Chemins inconnus retenus par worker (home/not_found.py) : nombre maximal et
+# durée (secondes). 0 désactive.
+NOT_FOUND_CACHE_SIZE = 1024
+NOT_FOUND_CACHE_TIMEOUT = 5 * 60
+
+# Recherche : résultats gardés en mémoire par worker, compteurs de recherches
+# enregistrés par lots, recherches populaires recalculées après publication.
+SEARCH_RESULT_CACHE_SIZE = 256
+SEARCH_HITS_FLUSH_INTERVAL = 60  # secondes
+SEARCH_POPULAR_QUERIES = 20
+
+# Mesures par requête (home/metrics.py) : en-tête Server-Timing, /metrics pour
+# Prometheus, et budget de requêtes SQL par type de page (vérifié par les tests
+# avec home.testing.QueryBudgetMixin, journalisé quand il est dépassé).
+# /metrics répond à `Authorization: Bearer <METRICS_TOKEN>` (vide : désactivé).
+# METRICS_ALLOWED_IPS (vide par défaut) n'a de sens que si REMOTE_ADDR est la
+# vraie adresse du client : derrière nginx sur la même machine, toutes les
+# requêtes viennent de 127.0.0.1.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+METRICS_ALLOWED_IPS = ()
+PAGE_QUERY_BUDGETS = {
+    "home.homepage": 15,
+    "home.showspage": 15,
+    "home.gallerypage": 15,
+    "home.presspage": 15,
+    "home.aboutpage": 15,
+    "home.contactpage": 15,
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "home": {"handlers": ["console"], "level": "WARNING"},
+    },
+}
+
 # Validation des mots de passe
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -109,12 +199,18 @@ STATIC_URL = "/static/"
 
 MEDIA_ROOT = BASE_DIR / "media"
 MEDIA_URL = "/media/"
+# `cleanup_media` ne supprime un fichier sans ligne en base qu'après ce délai
+# (secondes) : renditions en cours de génération, envois en cours.
+MEDIA_ORPHAN_GRACE_PERIOD = 60 * 60
 
 STORAGES = {
     "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
     "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
 }
 
+# Densités d'écran proposées par {% responsive_picture %} (1x, 2x, 3x)
+IMAGE_SRCSET_DENSITIES = (1, 2, 3)
+
 # Configuration Wagtail
 WAGTAIL_SITE_NAME = "wassim_site"
 WAGTAILADMIN_BASE_URL = "http://localhost:8000"
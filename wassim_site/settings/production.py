@@ -6,7 +6,17 @@ DEBUG = False
 # outdated JavaScript / CSS assets being served from cache
 # (e.g. after a Wagtail upgrade).
 # See https://docs.djangoproject.com/en/5.2/ref/contrib/staticfiles/#manifeststaticfilesstorage
-STORAGES["staticfiles"]["BACKEND"] = "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"
+# La variante maison écrit aussi des copies .br / .gz de chaque fichier texte,
+# servies par `home.staticfiles.serve_static`.
+STORAGES["staticfiles"]["BACKEND"] = "home.staticfiles.CompressedManifestStaticFilesStorage"
+
+# Cache partagé entre les workers gunicorn : une publication dans l'admin doit
+# invalider les pages servies par tous les processus.
+CACHES["default"] = {
+    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+    "LOCATION": BASE_DIR / "cache",
+    "OPTIONS": {"MAX_ENTRIES": 5000},
+}
 
 try:
     from .local import *
@@ -156,13 +156,9 @@ DATABASES = {
 }
 
 # 🚀 Production : PostgreSQL (recommandé)
-"""
-if not DEBUG:
-    import dj_database_url
-    DATABASES['default'] = dj_database_url.config(
-        default=config('DATABASE_URL')
-    )
-"""
+# ✅ Déjà géré par base.py : il suffit de définir DATABASE_URL (et, au besoin,
+#    DATABASE_CONN_MAX_AGE / DATABASE_POOL). Voir wassim_site/database.py.
+#    Comparer les deux bases : python manage.py benchmark_db --threads 8
 
 
 # ==========================================
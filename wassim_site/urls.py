@@ -6,13 +6,24 @@ from wagtail.admin import urls as wagtailadmin_urls
 from wagtail import urls as wagtail_urls
 from wagtail.documents import urls as wagtaildocs_urls
 
+from home.documents import serve_document
+from home.metrics import metrics_view
+from home.not_found import page_not_found
 from search import views as search_views
 
+# 404 déjà rendue pour les visiteurs anonymes (home/not_found.py)
+handler404 = page_not_found
+
 urlpatterns = [
     path("django-admin/", admin.site.urls),
     path("admin/", include(wagtailadmin_urls)),
+    # Avant les URLs de Wagtail : envoi par le proxy ou os.sendfile, avec Range (home/documents.py)
+    path("documents/<int:document_id>/<path:document_filename>", serve_document),
     path("documents/", include(wagtaildocs_urls)),
     path("search/", search_views.search, name="search"),
+    path("search/autocomplete/", search_views.search_autocomplete, name="search_autocomplete"),
+    path("api/v1/", include("api.urls")),
+    path("metrics", metrics_view, name="metrics"),
 ]
 
 
@@ -23,6 +34,13 @@ if settings.DEBUG:
     # Serve static and media files from development server
     urlpatterns += staticfiles_urlpatterns()
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+else:
+    from home.staticfiles import serve_static
+
+    # Fichiers statiques pré-compressés (.br / .gz) avec cache longue durée
+    urlpatterns += [
+        path(f"{settings.STATIC_URL.lstrip('/')}<path:path>", serve_static),
+    ]
 
 urlpatterns = urlpatterns + [
     # For anything not caught by a more specific rule above, hand over to